@@ -17,34 +17,74 @@ Options:
 """
 
 import argparse
+import hashlib
+import io
 import json
+import os
+import re
 import socket
 import subprocess
 import sys
+import tempfile
 import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
+from unittest import TestCase
+from unittest.mock import patch
 
 import httpx
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without LibYAML
+    from yaml import SafeLoader
+
+try:
+    from orjson import OPT_NON_STR_KEYS
+    from orjson import dumps as _orjson_dumps
+    from orjson import loads as json_loads
+
+    def json_dumps_bytes(obj: Any) -> bytes:
+        return _orjson_dumps(obj, option=OPT_NON_STR_KEYS)  # keys like an unquoted 200 become str, as with json
+
+except ImportError:  # orjson is optional, stdlib json is a slower but compatible fallback
+    json_loads = json.loads
+
+    def json_dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+
+# Path parameter placeholders, e.g. {slug}
+PARAM_RE = re.compile(r"\{[^}]+\}")
+
+# The only parts of the reference spec compare_specs reads, None meaning the whole subtree
+REFERENCE_SPEC_SECTIONS = {"paths": None, "components": {"parameters": None}}
 
 # Severity levels
-CRITICAL = "critical"
-WARNING = "warning"
-INFO = "info"
+# Interned so severity checks and Counter/dict lookups on them compare by identity first
+CRITICAL = sys.intern("critical")
+WARNING = sys.intern("warning")
+INFO = sys.intern("info")
 
 
+@dataclass(slots=True)
 class Difference:
     """Represents a difference between specs."""
 
-    def __init__(self, severity: str, category: str, path: str, message: str, expected: Any = None, actual: Any = None):
-        self.severity = severity
-        self.category = category
-        self.path = path
-        self.message = message
-        self.expected = expected
-        self.actual = actual
+    severity: str
+    category: str
+    path: str
+    message: str
+    expected: Any = None
+    actual: Any = None
+
+    def __post_init__(self):
+        self.severity = sys.intern(self.severity)
+        self.category = sys.intern(self.category)
 
     def to_dict(self) -> dict:
         result = {
@@ -69,9 +109,7 @@ def find_available_port() -> int:
 
 def normalize_path(path: str) -> str:
     """Normalize path for comparison (handle parameter naming differences)."""
-    import re
-
-    return re.sub(r"\{[^}]+\}", "{param}", path)
+    return PARAM_RE.sub("{param}", path)
 
 
 def resolve_ref(spec: dict, ref: str) -> dict:
@@ -88,20 +126,34 @@ def resolve_ref(spec: dict, ref: str) -> dict:
     return current if isinstance(current, dict) else {}
 
 
-def get_parameters_from_spec(spec: dict, params_list: list) -> list[dict]:
+def make_resolver(spec: dict) -> Callable[[str], dict]:
+    """Build a resolve_ref for one spec that walks each $ref pointer only once."""
+    cache = {}
+
+    def resolve(ref: str) -> dict:
+        try:
+            return cache[ref]
+        except KeyError:
+            resolved = cache[ref] = resolve_ref(spec, ref)
+            return resolved
+
+    return resolve
+
+
+def get_parameters_from_spec(resolve: Callable[[str], dict], params_list: list) -> list[dict]:
     """Extract and resolve parameters from a spec."""
     resolved = []
     for param in params_list:
         if "$ref" in param:
-            resolved.append(resolve_ref(spec, param["$ref"]))
+            resolved.append(resolve(param["$ref"]))
         else:
             resolved.append(param)
     return resolved
 
 
 def compare_parameters(
-    ref_spec: dict,
-    actual_spec: dict,
+    ref_resolve: Callable[[str], dict],
+    actual_resolve: Callable[[str], dict],
     ref_params: list,
     actual_params: list,
     path: str,
@@ -110,8 +162,8 @@ def compare_parameters(
     """Compare parameters between specs."""
     differences = []
 
-    ref_resolved = get_parameters_from_spec(ref_spec, ref_params)
-    actual_resolved = get_parameters_from_spec(actual_spec, actual_params)
+    ref_resolved = get_parameters_from_spec(ref_resolve, ref_params)
+    actual_resolved = get_parameters_from_spec(actual_resolve, actual_params)
 
     ref_by_name = {p.get("name"): p for p in ref_resolved if p.get("name")}
     actual_by_name = {p.get("name"): p for p in actual_resolved if p.get("name")}
@@ -215,8 +267,8 @@ def compare_responses(ref_responses: dict, actual_responses: dict, path: str, me
 
 
 def compare_operation(
-    ref_spec: dict,
-    actual_spec: dict,
+    ref_resolve: Callable[[str], dict],
+    actual_resolve: Callable[[str], dict],
     ref_op: dict,
     actual_op: dict,
     path: str,
@@ -268,7 +320,7 @@ def compare_operation(
     # Check parameters
     ref_params = ref_op.get("parameters", [])
     actual_params = actual_op.get("parameters", [])
-    differences.extend(compare_parameters(ref_spec, actual_spec, ref_params, actual_params, path, method))
+    differences.extend(compare_parameters(ref_resolve, actual_resolve, ref_params, actual_params, path, method))
 
     # Check responses
     ref_responses = ref_op.get("responses", {})
@@ -295,29 +347,23 @@ def strip_path_prefix(paths: dict, prefix: str) -> dict:
 
 def detect_path_prefix(paths: dict) -> str:
     """Detect common path prefix from paths."""
-    if not paths:
-        return ""
-    path_list = list(paths.keys())
-    if not path_list:
-        return ""
-
-    # Find common prefix
-    first = path_list[0]
-    prefix_parts = first.split("/")
-
-    for path in path_list[1:]:
-        parts = path.split("/")
-        common_len = 0
-        for i, (a, b) in enumerate(zip(prefix_parts, parts)):
-            if a == b and not a.startswith("{"):
-                common_len = i + 1
-            else:
-                break
-        prefix_parts = prefix_parts[:common_len]
-
-    if not prefix_parts or prefix_parts == [""]:
+    if len(paths) < 2:
+        return next(iter(paths), "")
+
+    # Find common prefix, bytewise in C, then back off to a "/" boundary unless it already ends on one in every path
+    keys = list(paths)
+    prefix = os.path.commonprefix(keys)
+    cut = len(prefix)
+    if not all(len(key) == cut or key[cut] == "/" for key in keys):
+        prefix = prefix[: max(prefix.rfind("/"), 0)]
+
+    # Parameter segments are not part of a prefix
+    if prefix.startswith("{"):
         return ""
-    return "/".join(prefix_parts)
+    param_start = prefix.find("/{")
+    if param_start != -1:
+        prefix = prefix[:param_start]
+    return prefix
 
 
 def compare_specs(ref_spec: dict, actual_spec: dict, path_prefix: str = "") -> list[Difference]:
@@ -326,19 +372,22 @@ def compare_specs(ref_spec: dict, actual_spec: dict, path_prefix: str = "") -> l
 
     ref_paths = ref_spec.get("paths", {})
     actual_paths = actual_spec.get("paths", {})
+    ref_resolve = make_resolver(ref_spec)
+    actual_resolve = make_resolver(actual_spec)
 
     # Auto-detect and strip path prefix from actual spec
     if not path_prefix:
         path_prefix = detect_path_prefix(actual_paths)
     actual_paths = strip_path_prefix(actual_paths, path_prefix)
 
-    # Build normalized path mappings
-    ref_normalized = {normalize_path(p): p for p in ref_paths}
-    actual_normalized = {normalize_path(p): p for p in actual_paths}
+    # Build normalized path mappings, carrying the path item along to avoid looking it up again
+    ref_normalized = {normalize_path(p): (p, methods) for p, methods in ref_paths.items()}
+    actual_normalized = {normalize_path(p): (p, methods) for p, methods in actual_paths.items()}
 
     # Check for missing endpoints
-    for norm_path, ref_path in ref_normalized.items():
-        if norm_path not in actual_normalized:
+    for norm_path, (ref_path, ref_methods) in ref_normalized.items():
+        actual_match = actual_normalized.get(norm_path)
+        if actual_match is None:
             differences.append(
                 Difference(
                     severity=CRITICAL,
@@ -350,9 +399,7 @@ def compare_specs(ref_spec: dict, actual_spec: dict, path_prefix: str = "") -> l
             )
             continue
 
-        actual_path = actual_normalized[norm_path]
-        ref_methods = ref_paths[ref_path]
-        actual_methods = actual_paths[actual_path]
+        actual_path, actual_methods = actual_match
 
         # Check methods for this endpoint
         for method in ref_methods:
@@ -371,7 +418,7 @@ def compare_specs(ref_spec: dict, actual_spec: dict, path_prefix: str = "") -> l
             else:
                 ref_op = ref_methods[method]
                 actual_op = actual_methods[method]
-                differences.extend(compare_operation(ref_spec, actual_spec, ref_op, actual_op, ref_path, method))
+                differences.extend(compare_operation(ref_resolve, actual_resolve, ref_op, actual_op, ref_path, method))
 
         # Check for extra methods (info level)
         for method in actual_methods:
@@ -389,7 +436,7 @@ def compare_specs(ref_spec: dict, actual_spec: dict, path_prefix: str = "") -> l
                 )
 
     # Check for extra endpoints (info level)
-    for norm_path, actual_path in actual_normalized.items():
+    for norm_path, (actual_path, _) in actual_normalized.items():
         if norm_path not in ref_normalized:
             differences.append(
                 Difference(
@@ -438,60 +485,57 @@ def find_broken_refs(spec: dict) -> list[Difference]:
     return differences
 
 
-def format_text(differences: list[Difference], passed: bool) -> str:
+Summary = tuple[Counter, dict[str, list[Difference]]]
+
+
+def _summarize(differences: list[Difference]) -> Summary:
+    """Count differences per severity and group them by severity, in a single pass."""
+    counts = Counter()
+    by_severity = {CRITICAL: [], WARNING: [], INFO: []}
+    for d in differences:
+        counts[d.severity] += 1
+        by_severity.setdefault(d.severity, []).append(d)
+    return counts, by_severity
+
+
+def format_text(differences: list[Difference], passed: bool, summary: Summary) -> str:
     """Format differences as plain text."""
-    lines = [
-        "OpenAPI Spec Comparison",
-        "=======================",
-    ]
+    buf = io.StringIO()
+    w = buf.write
+    w("OpenAPI Spec Comparison\n=======================\n")
 
-    critical_count = sum(1 for d in differences if d.severity == CRITICAL)
-    warning_count = sum(1 for d in differences if d.severity == WARNING)
-    info_count = sum(1 for d in differences if d.severity == INFO)
+    counts, by_severity = summary
+    critical_count, warning_count, info_count = counts[CRITICAL], counts[WARNING], counts[INFO]
 
     status = "PASSED" if passed else "FAILED"
-    lines.append(f"Status: {status}")
-    lines.append(f"Critical: {critical_count} | Warnings: {warning_count} | Info: {info_count}")
-    lines.append("")
+    w(f"Status: {status}\n")
+    w(f"Critical: {critical_count} | Warnings: {warning_count} | Info: {info_count}\n\n")
 
     if critical_count > 0:
-        lines.append("CRITICAL:")
-        for d in differences:
-            if d.severity == CRITICAL:
-                msg = f"[C] {d.message}"
-                if d.expected:
-                    msg += f" (expected: {d.expected})"
-                lines.append(msg)
-        lines.append("")
+        w("CRITICAL:\n")
+        for d in by_severity[CRITICAL]:
+            w(f"[C] {d.message}{f' (expected: {d.expected})' if d.expected else ''}\n")
+        w("\n")
 
     if warning_count > 0:
-        lines.append("WARNINGS:")
-        for d in differences:
-            if d.severity == WARNING:
-                msg = f"[W] {d.message} for {d.path}"
-                if d.expected:
-                    msg += f" (expected: {d.expected})"
-                lines.append(msg)
-        lines.append("")
+        w("WARNINGS:\n")
+        for d in by_severity[WARNING]:
+            w(f"[W] {d.message} for {d.path}{f' (expected: {d.expected})' if d.expected else ''}\n")
+        w("\n")
 
     if info_count > 0:
-        lines.append("INFO:")
-        for d in differences:
-            if d.severity == INFO:
-                msg = f"[I] {d.message}"
-                if d.actual:
-                    msg += f" ({d.actual})"
-                lines.append(msg)
-        lines.append("")
+        w("INFO:\n")
+        for d in by_severity[INFO]:
+            w(f"[I] {d.message}{f' ({d.actual})' if d.actual else ''}\n")
+        w("\n")
 
-    return "\n".join(lines)
+    return buf.getvalue()[:-1]  # Every line is newline-terminated, print() adds the last one
 
 
-def format_json(differences: list[Difference], passed: bool) -> str:
+def format_json(differences: list[Difference], passed: bool, summary: Summary) -> str:
     """Format differences as JSON."""
-    critical_count = sum(1 for d in differences if d.severity == CRITICAL)
-    warning_count = sum(1 for d in differences if d.severity == WARNING)
-    info_count = sum(1 for d in differences if d.severity == INFO)
+    counts = summary[0]
+    critical_count, warning_count, info_count = counts[CRITICAL], counts[WARNING], counts[INFO]
 
     result = {
         "passed": passed,
@@ -505,77 +549,106 @@ def format_json(differences: list[Difference], passed: bool) -> str:
     return json.dumps(result, indent=2)
 
 
-def format_markdown(differences: list[Difference], passed: bool) -> str:
+def format_markdown(differences: list[Difference], passed: bool, summary: Summary) -> str:
     """Format differences as Markdown."""
-    lines = ["# OpenAPI Comparison Report", ""]
+    buf = io.StringIO()
+    w = buf.write
+    w("# OpenAPI Comparison Report\n\n")
 
-    critical_count = sum(1 for d in differences if d.severity == CRITICAL)
-    warning_count = sum(1 for d in differences if d.severity == WARNING)
-    info_count = sum(1 for d in differences if d.severity == INFO)
+    counts, by_severity = summary
+    critical_count, warning_count, info_count = counts[CRITICAL], counts[WARNING], counts[INFO]
 
     status = "PASSED" if passed else "FAILED"
-    lines.extend(
-        [
-            "## Summary",
-            f"- **Status**: {status}",
-            f"- **Critical**: {critical_count}",
-            f"- **Warnings**: {warning_count}",
-            f"- **Info**: {info_count}",
-            "",
-        ]
+    w(
+        "## Summary\n"
+        f"- **Status**: {status}\n"
+        f"- **Critical**: {critical_count}\n"
+        f"- **Warnings**: {warning_count}\n"
+        f"- **Info**: {info_count}\n"
+        "\n"
     )
 
-    if critical_count > 0:
-        lines.extend(["## Critical Issues", ""])
-        for d in differences:
-            if d.severity == CRITICAL:
-                lines.append(f"### {d.category.replace('_', ' ').title()}")
-                lines.append(f"- **Path**: {d.path}")
-                lines.append(f"- **Message**: {d.message}")
-                if d.expected:
-                    lines.append(f"- **Expected**: {d.expected}")
-                lines.append("")
-
-    if warning_count > 0:
-        lines.extend(["## Warnings", ""])
-        for d in differences:
-            if d.severity == WARNING:
-                lines.append(f"### {d.category.replace('_', ' ').title()}")
-                lines.append(f"- **Path**: {d.path}")
-                lines.append(f"- **Message**: {d.message}")
-                if d.expected:
-                    lines.append(f"- **Expected**: {d.expected}")
-                lines.append("")
+    for count, severity, title in ((critical_count, CRITICAL, "Critical Issues"), (warning_count, WARNING, "Warnings")):
+        if count > 0:
+            w(f"## {title}\n\n")
+            for d in by_severity[severity]:
+                expected = f"- **Expected**: {d.expected}\n" if d.expected else ""
+                w(
+                    f"### {d.category.replace('_', ' ').title()}\n"
+                    f"- **Path**: {d.path}\n"
+                    f"- **Message**: {d.message}\n"
+                    f"{expected}\n"
+                )
 
     if info_count > 0:
-        lines.extend(["## Info", ""])
-        for d in differences:
-            if d.severity == INFO:
-                lines.append(f"- {d.message}")
-                if d.path:
-                    lines.append(f"  - Path: {d.path}")
-        lines.append("")
+        w("## Info\n\n")
+        for d in by_severity[INFO]:
+            w(f"- {d.message}\n")
+            if d.path:
+                w(f"  - Path: {d.path}\n")
+        w("\n")
+
+    return buf.getvalue()[:-1]  # Every line is newline-terminated, print() adds the last one
 
-    return "\n".join(lines)
+
+def select_sections(node: Any, sections: dict | None) -> Any:
+    """Keep only the listed keys of a loaded YAML mapping, recursively, None keeping the whole subtree."""
+    if sections is None or not isinstance(node, dict):
+        return node
+    return {key: select_sections(value, sections[key]) for key, value in node.items() if key in sections}
 
 
 def load_reference_spec(path: str) -> dict:
-    """Load the reference OpenAPI spec from YAML file."""
+    """Load the reference OpenAPI spec from YAML file, through a JSON sidecar cached by content hash."""
     spec_path = Path(path)
     if not spec_path.exists():
         print(f"Error: Reference spec not found at {path}", file=sys.stderr)
         sys.exit(2)
 
-    with open(spec_path) as f:
-        return yaml.safe_load(f)
+    raw = spec_path.read_bytes()
+    # Per-user cache, a shared temp dir would let other users plant sidecars or symlinks
+    cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "realworld-compare-openapi"
+    # The sidecar only holds the selected sections, so the selection is part of the key along with the YAML
+    cache_key = hashlib.sha256(raw)
+    cache_key.update(json.dumps(REFERENCE_SPEC_SECTIONS, sort_keys=True).encode())
+    cache_path = cache_dir / f"openapi-{cache_key.hexdigest()[:16]}.json"
+    try:
+        return json_loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        pass  # no usable cache, parse the YAML
 
+    if not SafeLoader.__name__.startswith("C"):
+        print("Warning: LibYAML not available, falling back to the slower pure-Python loader", file=sys.stderr)
+    spec = select_sections(yaml.load(raw, Loader=SafeLoader), REFERENCE_SPEC_SECTIONS)
 
-def fetch_actual_spec(url: str) -> dict:
+    try:
+        encoded = json_dumps_bytes(spec)
+    except (TypeError, ValueError):
+        return spec  # not representable as JSON, so never cached and every run gets the same document
+    # Returned as the sidecar will give it back, e.g. with an unquoted 200 response code as a "200" key
+    spec = json_loads(encoded)
+
+    # Write-then-rename keeps readers safe, the temp file gets an unguessable name and is created exclusively
+    try:
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_dir, prefix=f"{cache_path.name}.", delete=False) as tmp_file:
+            tmp_file.write(encoded)
+        try:
+            os.replace(tmp_file.name, cache_path)
+        except OSError:
+            os.unlink(tmp_file.name)
+            raise
+    except OSError:
+        pass  # caching is best-effort
+    return spec
+
+
+def fetch_actual_spec(client: httpx.Client, url: str) -> dict:
     """Fetch the OpenAPI spec from a running server."""
     try:
-        response = httpx.get(url, timeout=30)
+        response = client.get(url, timeout=30)
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
     except httpx.HTTPError as e:
         print(f"Error fetching OpenAPI spec: {e}", file=sys.stderr)
         sys.exit(2)
@@ -588,8 +661,6 @@ def start_server(port: int) -> subprocess.Popen:
         "DISABLE_ISOLATION_MODE": "True",
     }
 
-    import os
-
     full_env = os.environ.copy()
     full_env.update(env)
 
@@ -602,17 +673,19 @@ def start_server(port: int) -> subprocess.Popen:
     return process
 
 
-def wait_for_server(url: str, timeout: int = 30) -> bool:
-    """Wait for server to be ready."""
-    start_time = time.time()
-    while time.time() - start_time < timeout:
+def wait_for_server(client: httpx.Client, url: str, timeout: int = 30) -> bool:
+    """Wait for server to be ready, polling often at first then backing off up to 500ms."""
+    deadline = time.monotonic() + timeout
+    delay = 0.02
+    while time.monotonic() < deadline:
         try:
-            response = httpx.get(url, timeout=2)
+            response = client.get(url, timeout=2)
             if response.status_code in (200, 404):
                 return True
         except httpx.HTTPError:
             pass
-        time.sleep(0.5)
+        time.sleep(delay)
+        delay = min(delay * 1.6, 0.5)
     return False
 
 
@@ -642,6 +715,8 @@ def main():
     ref_spec = load_reference_spec(args.reference)
 
     server_process = None
+    # One connection pool for readiness polling and the spec fetch, which usually hit the same origin
+    client = httpx.Client(timeout=30)
     try:
         if args.server_url:
             # Use existing server (user provides base URL, e.g., http://127.0.0.1:8000)
@@ -656,19 +731,20 @@ def main():
             base_url = f"http://127.0.0.1:{port}/api"
             openapi_url = f"http://127.0.0.1:{port}/openapi.json"
 
-            if not wait_for_server(f"http://127.0.0.1:{port}/api/tags"):
+            if not wait_for_server(client, f"http://127.0.0.1:{port}/api/tags"):
                 print("Error: Server failed to start within timeout", file=sys.stderr)
                 sys.exit(2)
 
         # Fetch actual spec
-        actual_spec = fetch_actual_spec(openapi_url)
+        actual_spec = fetch_actual_spec(client, openapi_url)
 
         # Compare specs
         differences = compare_specs(ref_spec, actual_spec)
 
         # Determine pass/fail
-        critical_count = sum(1 for d in differences if d.severity == CRITICAL)
-        warning_count = sum(1 for d in differences if d.severity == WARNING)
+        summary = _summarize(differences)
+        counts = summary[0]
+        critical_count, warning_count = counts[CRITICAL], counts[WARNING]
 
         if args.strict:
             passed = critical_count == 0 and warning_count == 0
@@ -677,11 +753,11 @@ def main():
 
         # Format output
         if args.format == "json":
-            output = format_json(differences, passed)
+            output = format_json(differences, passed, summary)
         elif args.format == "markdown":
-            output = format_markdown(differences, passed)
+            output = format_markdown(differences, passed, summary)
         else:
-            output = format_text(differences, passed)
+            output = format_text(differences, passed, summary)
 
         print(output)
 
@@ -689,6 +765,7 @@ def main():
         sys.exit(0 if passed else 1)
 
     finally:
+        client.close()
         if server_process:
             server_process.terminate()
             try:
@@ -697,5 +774,65 @@ def main():
                 server_process.kill()
 
 
+class TestLoadReferenceSpec(TestCase):
+    SPEC = b"paths:\n  /tags:\n    get:\n      responses:\n        200:\n          description: OK\n"
+
+    def test_same_spec_with_cold_and_warm_cache(self):
+        def stdlib_dumps(obj):
+            return json.dumps(obj).encode()
+
+        for name, dumps, loads in [("default", json_dumps_bytes, json_loads), ("stdlib", stdlib_dumps, json.loads)]:
+            with (
+                self.subTest(backend=name),
+                tempfile.TemporaryDirectory() as tmp,
+                patch.dict(os.environ, {"XDG_CACHE_HOME": tmp}),
+                patch(f"{__name__}.json_dumps_bytes", dumps),
+                patch(f"{__name__}.json_loads", loads),
+            ):
+                spec_path = Path(tmp) / "openapi.yml"
+                spec_path.write_bytes(self.SPEC)
+                cold = load_reference_spec(str(spec_path))
+                self.assertEqual(len(list(Path(tmp).glob("realworld-compare-openapi/*"))), 1)  # no temp file left
+                warm = load_reference_spec(str(spec_path))
+                self.assertEqual(cold, warm)
+                self.assertEqual(list(cold["paths"]["/tags"]["get"]["responses"]), ["200"])
+
+    def test_sections_change_with_warm_cache(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"XDG_CACHE_HOME": tmp}):
+            spec_path = Path(tmp) / "openapi.yml"
+            spec_path.write_bytes(b"info:\n  title: Conduit\n" + self.SPEC)
+            with patch(f"{__name__}.REFERENCE_SPEC_SECTIONS", {"paths": None}):
+                self.assertEqual(list(load_reference_spec(str(spec_path))), ["paths"])
+            with patch(f"{__name__}.REFERENCE_SPEC_SECTIONS", {"info": None, "paths": None}):
+                self.assertEqual(list(load_reference_spec(str(spec_path))), ["info", "paths"])
+
+    def test_same_document_as_safe_load(self):
+        documents = [
+            b"",
+            self.SPEC,
+            b"paths: !!omap\n  - /tags: {}\n  - /user: {}\n",
+            b"paths: !!set {/tags: null}\n",
+            b"get: &get {responses: {200: {description: OK}}}\npaths:\n  /tags: {get: *get}\n",
+        ]
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            patch.dict(os.environ, {"XDG_CACHE_HOME": tmp}),
+            patch(f"{__name__}.REFERENCE_SPEC_SECTIONS", {"paths": None}),
+        ):
+            spec_path = Path(tmp) / "openapi.yml"
+            for document in documents:
+                with self.subTest(document=document):
+                    spec_path.write_bytes(document)
+                    expected = yaml.safe_load(document)
+                    if expected is not None:
+                        expected = {"paths": expected["paths"]}
+                    try:
+                        expected = json.loads(json.dumps(expected))
+                    except TypeError:
+                        pass  # not representable as JSON, returned as loaded
+                    self.assertEqual(load_reference_spec(str(spec_path)), expected)  # cold
+                    self.assertEqual(load_reference_spec(str(spec_path)), expected)  # warm
+
+
 if __name__ == "__main__":
     main()
@@ -3,31 +3,99 @@
 
 import argparse
 import hashlib
+import mmap
+import os
+import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Hashed files contain a hash pattern like -ABC123. or .abc123. before extension
+# Match patterns like: chunk-ABC123.js, main-XYZ789.js, styles-ABC123.css
+HASHED_NAME_RE = re.compile(r"[-.][A-Za-z0-9]{7,}\.[a-z]+$")
+# Below this many files, a thread pool costs more than it saves
+PARALLEL_HASH_MIN_FILES = 8
+if sys.platform == "linux":  # FICLONE is a Linux ioctl, and fcntl doesn't exist on Windows
+    import fcntl
+
+    # fcntl only exposes FICLONE from Python 3.12, the value is _IOW(0x94, 9, int) on Linux
+    FICLONE = getattr(fcntl, "FICLONE", 0x40049409)
+else:
+    FICLONE = None
+
 
 def hash_file(path: Path) -> str:
     """Compute SHA256 hash of a file."""
-    h = hashlib.sha256()
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
-def get_file_hashes(directory: Path) -> dict[str, str]:
-    """Get hashes of all files in a directory."""
-    hashes = {}
-    if directory.exists():
-        for path in directory.rglob("*"):
-            if path.is_file():
-                rel_path = str(path.relative_to(directory))
-                hashes[rel_path] = hash_file(path)
-    return hashes
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+, the read loop runs in C
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        if os.fstat(f.fileno()).st_size <= 4096:  # small files, and mmap can't map empty ones
+            return hashlib.sha256(f.read()).hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest()
+
+
+def fast_copy(src: Path | str, dst: Path | str) -> None:
+    """Copy a file like shutil.copy2, as a reflink or an in-kernel copy when the filesystem allows."""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        cloned = False
+        if FICLONE is not None:
+            try:  # Reflink on BTRFS/XFS, shares the extents so no data is copied at all
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                cloned = True
+            except OSError:
+                pass
+        if not cloned:
+            try:  # In-kernel copy, no userspace bounce buffer
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            except (AttributeError, OSError):  # copy_file_range is Linux/FreeBSD only, may refuse cross-device copies
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+                shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst)
+
+
+def link_or_copy(src: Path | str, dst: Path | str) -> None:
+    """Hardlink a file, copying it instead when src and dst are on different filesystems."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        fast_copy(src, dst)
+
+
+def list_files(directory: Path) -> list[str]:
+    """List all files in a directory, relative to it."""
+    # os.walk works on plain strings with scandir's cached entry types, no Path or extra stat per file
+    files = []
+    prefix_len = len(os.path.join(directory, ""))
+    for root, _, names in os.walk(directory):
+        rel_root = root[prefix_len:]
+        files.extend(os.path.join(rel_root, name) for name in names)
+    return files
+
+
+def get_file_hashes(directory: Path, rel_paths: list[str] | None = None) -> dict[str, str]:
+    """Get hashes of files in a directory, all of them unless rel_paths is given."""
+    if rel_paths is None:
+        rel_paths = list_files(directory)
+    paths = [directory / rel_path for rel_path in rel_paths]
+    if len(paths) < PARALLEL_HASH_MIN_FILES:
+        digests = map(hash_file, paths)
+    else:  # hashlib releases the GIL on large buffers, so threads scale with cores
+        with ThreadPoolExecutor() as executor:
+            digests = list(executor.map(hash_file, paths))
+    return dict(zip(rel_paths, digests))
 
 
 def download_release(repo: str, tmp_dir: Path) -> Path:
@@ -42,7 +110,27 @@ def download_release(repo: str, tmp_dir: Path) -> Path:
 def extract_zip(zip_path: Path, extract_to: Path) -> None:
     """Extract zip file to directory."""
     print(f"Extracting to {extract_to}...")
-    shutil.unpack_archive(zip_path, extract_to)
+    # zlib releases the GIL while inflating, but a ZipFile shares one file position, so one per worker thread
+    local = threading.local()
+    opened = []
+
+    def extract_member(name: str) -> None:
+        if not hasattr(local, "zf"):
+            local.zf = zipfile.ZipFile(zip_path)
+            opened.append(local.zf)
+        try:
+            local.zf.extract(name, extract_to)
+        except FileExistsError:  # Another worker created the same parent directory between check and mkdir
+            local.zf.extract(name, extract_to)
+
+    with zipfile.ZipFile(zip_path) as zf:
+        names = zf.namelist()
+    try:
+        with ThreadPoolExecutor() as executor:
+            list(executor.map(extract_member, names))
+    finally:
+        for zf in opened:
+            zf.close()
 
 
 def deploy_atomic(src: Path, dest: Path, keep_versions: int = 3, save_version_enabled: bool = True) -> None:
@@ -52,56 +140,64 @@ def deploy_atomic(src: Path, dest: Path, keep_versions: int = 3, save_version_en
     2. Copy non-hashed files last (index.html, etc.)
     3. Remove orphaned files from old deployment
     """
-    old_hashes = get_file_hashes(dest)
-    new_hashes = get_file_hashes(src)
+    old_files = set(list_files(dest))
+    new_files = list_files(src)
 
     # Separate hashed (immutable) files from entry points
-    # Hashed files contain a hash pattern like -ABC123. or .abc123. before extension
     def is_hashed(filename: str) -> bool:
-        import re
-
-        basename = filename.rsplit("/", 1)[-1]
-        # Match patterns like: chunk-ABC123.js, main-XYZ789.js, styles-ABC123.css
-        return bool(re.search(r"[-.][A-Za-z0-9]{7,}\.[a-z]+$", basename))
+        return bool(HASHED_NAME_RE.search(filename.rsplit("/", 1)[-1]))
 
-    hashed_files = [f for f in new_hashes if is_hashed(f)]
-    entry_files = [f for f in new_hashes if not is_hashed(f)]
+    hashed_files = [f for f in new_files if is_hashed(f)]
+    entry_files = [f for f in new_files if not is_hashed(f)]
 
     dest.mkdir(parents=True, exist_ok=True)
 
     # Phase 1: Copy hashed/immutable files first
+    # The name already carries the content hash, so a same-size file at the same path is the same file
     copied_hashed = 0
     for rel_path in hashed_files:
         src_file = src / rel_path
         dest_file = dest / rel_path
-        if old_hashes.get(rel_path) != new_hashes[rel_path]:
-            dest_file.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(src_file, dest_file)
-            copied_hashed += 1
+        if rel_path in old_files and dest_file.stat().st_size == src_file.stat().st_size:
+            continue
+        dest_file.parent.mkdir(parents=True, exist_ok=True)
+        fast_copy(src_file, dest_file)
+        copied_hashed += 1
     print(
         f"Copied {copied_hashed}/{len(hashed_files)} hashed assets (skipped {len(hashed_files) - copied_hashed} unchanged)"
     )
 
-    # Phase 2: Copy entry point files (index.html, etc.)
-    print(f"Copying {len(entry_files)} entry files...")
-    for rel_path in entry_files:
+    # Phase 2: Copy entry point files (index.html, etc.), only these need their content hashed
+    new_hashes = get_file_hashes(src, entry_files)
+    old_hashes = get_file_hashes(dest, [f for f in entry_files if f in old_files])
+    changed_entry_files = [f for f in entry_files if old_hashes.get(f) != new_hashes[f]]
+    print(f"Copying {len(changed_entry_files)}/{len(entry_files)} entry files...")
+    for rel_path in changed_entry_files:
         src_file = src / rel_path
         dest_file = dest / rel_path
         dest_file.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src_file, dest_file)
+        # Copy next to the live file then rename over it, so clients never read a half-written index.html
+        tmp_file = dest_file.with_name(dest_file.name + ".new")
+        fast_copy(src_file, tmp_file)
+        os.replace(tmp_file, dest_file)
 
     # Phase 3: Remove orphaned files
-    orphaned = set(old_hashes.keys()) - set(new_hashes.keys())
+    orphaned = old_files.difference(new_files)
     if orphaned:
         print(f"Removing {len(orphaned)} orphaned files...")
         for rel_path in orphaned:
-            orphan_file = dest / rel_path
-            if orphan_file.exists():
-                orphan_file.unlink()
-        # Clean up empty directories
-        for dir_path in sorted(dest.rglob("*"), key=lambda p: -len(p.parts)):
-            if dir_path.is_dir() and not any(dir_path.iterdir()):
-                dir_path.rmdir()
+            try:
+                os.unlink(dest / rel_path)
+            except FileNotFoundError:
+                pass
+        # Clean up empty directories, bottom-up so a dir emptied by removing its subdirs goes too
+        for root, _, _ in os.walk(dest, topdown=False):
+            if root == str(dest):
+                continue
+            try:
+                os.rmdir(root)
+            except OSError:  # Not empty
+                pass
 
     # Phase 4: Save version for rollback
     if save_version_enabled:
@@ -117,7 +213,9 @@ def save_version(src: Path, versions_dir: Path, keep: int) -> None:
     version_path = versions_dir / timestamp
 
     print(f"Saving version {timestamp}...")
-    shutil.copytree(src, version_path)
+    # Snapshots hardlink the build dir, never the webroot, which deploys rewrite in place
+    # Deleting the build dir afterwards only drops a link, the snapshot keeps the data
+    shutil.copytree(src, version_path, copy_function=link_or_copy)
 
     # Cleanup old versions
     versions = sorted(versions_dir.iterdir(), reverse=True)
@@ -17,16 +17,20 @@ https://github.com/c4ffein/realworld-django-ninja/
   - Data can actually be saved on SIGINT reception if the DATA_FILE_PATH var env is set (so only handles `kill -2` rn)
 - **Session isolation via token**: Each JWT token is bound to a session; re-login with credentials finds your data
 - **Minimal dependencies**: Only FastAPI + uvicorn
+  - orjson is used for faster log and response serialization when installed, it is optional
 - **Single file**: Entire server implementation in one module
 - **Simple logging**: Of most operations (see `Deploy`)
 
 ## Rate Limiting
 - Applied per IP address (IPv4) or /64 range (IPv6) via MAX_SESSIONS_PER_IP
 - There are limits on the objects that will be saved in memory
+- Once MAX_SESSIONS is reached, the least recently used session is evicted
+  - SESSION_EVICTION_CANDIDATES > 1 evicts the smallest of that many least recently used sessions instead
 
 ## Deploy
 - You should also rate limit per IPv4 address and IPv6 range through a reverse proxy
 - You should still limit the max body size per request through a reverse proxy
+- You can set UVICORN_BACKLOG / UVICORN_LIMIT_CONCURRENCY to tune how many connections uvicorn accepts
 - You should set LOG_LEVEL / LOG_FILE / LOG_MAX_SIZE / LOG_BACKUP_COUNT to enable rotating logs
 - You should set CLIENT_IP_HEADER when running behind a reverse proxy (e.g., "X-Forwarded-For" or "X-Real-IP")
   - This ensures proper client IP detection for rate limiting when behind nginx, Apache, or load balancers
@@ -43,17 +47,23 @@ https://github.com/c4ffein/realworld-django-ninja/
 ⚠️  DO NOT BASE NON-DEMO PROJECTS ON THIS SPECIFIC IMPLEMENTATION  ⚠️
 """
 
+import atexit
 import hashlib
+import heapq
+import ipaddress
 import json
 import logging
 import logging.handlers
+import queue
 import re
 import sys
 import time
 import uuid
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from os import getenv
+from functools import lru_cache
+from os import fsync, getenv
 from pathlib import Path
 from time import time_ns
 from typing import Annotated, Dict, List, Optional, Tuple
@@ -67,6 +77,42 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader
 from pydantic import BaseModel
 
+# Built once, json.dumps creates a new encoder on every call made with non-default arguments
+encode_compact_json = json.JSONEncoder(separators=(",", ":")).encode
+encode_response_json = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode
+
+try:
+    from orjson import dumps as _orjson_dumps
+    from orjson import loads as loads_data_file
+
+    def dumps_log_entry(log_entry: dict) -> str:
+        try:
+            return _orjson_dumps(log_entry).decode()
+        except TypeError:  # stricter than json on some types (e.g. non-str keys), keep json's behavior for those
+            return json.dumps(log_entry)
+
+    def dumps_data_file(data: dict) -> bytes:  # compact, the data file is meant to be reloaded, not read
+        try:
+            return _orjson_dumps(data)
+        except TypeError:
+            return encode_compact_json(data).encode()
+
+    def dumps_response(content) -> bytes:
+        try:
+            return _orjson_dumps(content)
+        except TypeError:
+            return encode_response_json(content).encode()
+
+except ImportError:  # orjson is optional, it only makes log, data file and response serialization faster
+    dumps_log_entry = json.dumps
+    loads_data_file = json.loads
+
+    def dumps_data_file(data: dict) -> bytes:
+        return encode_compact_json(data).encode()
+
+    def dumps_response(content) -> bytes:  # same output as starlette's JSONResponse
+        return encode_response_json(content).encode()
+
 #### CONFIGURATION #####################################################################################################
 
 
@@ -77,8 +123,14 @@ PATH_PREFIX_PARTS = PATH_PREFIX.strip("/").split("/")
 DISABLE_ISOLATION_MODE = getenv("DISABLE_ISOLATION_MODE", "FALSE").lower() == "true"
 MAX_SESSIONS = int(getenv("MAX_SESSIONS") or 30000)
 MAX_SESSIONS_PER_IP = int(getenv("MAX_SESSIONS_PER_IP") or 10)
+# when full, evict the smallest of this many least recently used sessions, 1 keeps plain LRU eviction, at most 10
+SESSION_EVICTION_CANDIDATES = int(getenv("SESSION_EVICTION_CANDIDATES") or 1)
+# uvicorn tuning, a single worker only as all data lives in this process
+UVICORN_BACKLOG = int(getenv("UVICORN_BACKLOG") or 2048)  # pending connections queued by the kernel
+UVICORN_LIMIT_CONCURRENCY = int(getenv("UVICORN_LIMIT_CONCURRENCY") or 0) or None  # above this, answers 503
 # client ip detection
 CLIENT_IP_HEADER = getenv("CLIENT_IP_HEADER")  # Optional header name for client IP detection
+CLIENT_IP_HEADER_KEY = CLIENT_IP_HEADER.lower().encode("latin-1") if CLIENT_IP_HEADER else None  # as ASGI sends it
 # logging
 LOG_LEVEL = getenv("LOG_LEVEL", "INFO").upper()
 LOG_FILE = getenv("LOG_FILE")  # Optional file logging
@@ -130,9 +182,19 @@ DEMO_DATA_DEFAULT_IMAGE = getenv(
 
 
 class JSONFormatter(logging.Formatter):
+    _last_second = (None, "")  # (epoch second, formatted), so strftime only runs once per second
+
     def format(self, record):
+        second = int(record.created)  # rounded the way datetime.fromtimestamp does
+        microsecond = round((record.created - second) * 1_000_000)
+        if microsecond == 1_000_000:
+            second, microsecond = second + 1, 0
+        last_second, formatted_second = self._last_second
+        if second != last_second:
+            formatted_second = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+            self._last_second = (second, formatted_second)
         log_entry = {
-            "timestamp": datetime.fromtimestamp(record.created).strftime("%Y-%m-%dT%H:%M:%S.%f"),
+            "timestamp": f"{formatted_second}.{microsecond:06d}",
             "logger": record.name,
             "level": record.levelname,
             "category": (lambda v: f"{record.name}.{v}" if v is not None else record.name)(
@@ -141,11 +203,14 @@ class JSONFormatter(logging.Formatter):
             "message": record.getMessage(),
             "data": getattr(record, "data", {}),
         }
-        return json.dumps(log_entry)
+        return dumps_log_entry(log_entry)
 
 
 def setup_logging():
-    """Set up logging configuration with console and optional file output"""
+    """
+    Set up logging configuration with console and optional file output
+    Records are only enqueued by the event loop, a QueueListener thread formats them and writes them out
+    """
     # Create root logger
     logger = logging.getLogger()
     logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
@@ -156,14 +221,19 @@ def setup_logging():
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
     # Optional file handler with rotation
     if LOG_FILE:
         file_handler = logging.handlers.RotatingFileHandler(
             LOG_FILE, maxBytes=LOG_MAX_SIZE, backupCount=LOG_BACKUP_COUNT
         )
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # flushes the records still queued on exit, including the save_data ones
     return logger
 
 
@@ -181,6 +251,8 @@ lifecycle_logger = logging.getLogger("lifecycle")
 
 def log_structured(logger, level, message, category=None, **extra_data_fields):
     """Helper function to log structured data as JSON"""
+    if not logger.isEnabledFor(level):  # skip building the extra dict for filtered out levels
+        return
     logger.log(level, message, extra={"category": category or "general", "data": extra_data_fields})
 
 
@@ -192,11 +264,23 @@ def format_datetime(dt: datetime) -> str:
     return dt.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
 
 
-def get_current_time() -> str:
-    """Get current time in ISO format"""
-    return format_datetime(datetime.now(timezone.utc))
+_last_current_time = (None, "")  # (epoch millisecond, formatted), the precision kept by format_datetime
 
 
+def get_current_time() -> str:
+    """Get current time in ISO format, only formatted again once the millisecond changes"""
+    global _last_current_time
+    millisecond = time_ns() // 1_000_000
+    last_millisecond, formatted = _last_current_time
+    if millisecond != last_millisecond:
+        second, millisecond_part = divmod(millisecond, 1000)
+        dt = datetime.fromtimestamp(second, timezone.utc).replace(microsecond=millisecond_part * 1000)
+        formatted = format_datetime(dt)
+        _last_current_time = (millisecond, formatted)
+    return formatted
+
+
+@lru_cache(maxsize=256)  # logins recur with the same few passwords, bounded so it can't grow with requests
 def hash_password(password: str) -> str:
     """Simple password hashing"""
     return hashlib.sha256(password.encode()).hexdigest()
@@ -205,192 +289,194 @@ def hash_password(password: str) -> str:
 #### DEMO_DATA #########################################################################################################
 
 
+DEMO_PASSWORD_HASH = hash_password("password123")
+# Demo tables are built once at import, populate_demo_data only fills in ids and timestamps
+_DEMO_USERS_DATA = (
+    {
+        "email": "john.doe@example.com",
+        "username": "johndoe",
+        "password": DEMO_PASSWORD_HASH,
+        "bio": "Full-stack developer passionate about clean code and innovative solutions. Love working with modern web technologies.",
+        "image": DEMO_DATA_DEFAULT_IMAGE,
+    },
+    {
+        "email": "jane.smith@example.com",
+        "username": "janesmith",
+        "password": DEMO_PASSWORD_HASH,
+        "bio": "Frontend developer with a keen eye for UI/UX design. Specializing in React and modern CSS frameworks.",
+        "image": DEMO_DATA_DEFAULT_IMAGE,
+    },
+    {
+        "email": "mike.wilson@example.com",
+        "username": "mikewilson",
+        "password": DEMO_PASSWORD_HASH,
+        "bio": "Backend engineer focused on scalable architecture and DevOps. Enthusiast of cloud technologies and automation.",
+        "image": DEMO_DATA_DEFAULT_IMAGE,
+    },
+    {
+        "email": "sarah.chen@example.com",
+        "username": "sarahchen",
+        "password": DEMO_PASSWORD_HASH,
+        "bio": "Data scientist and machine learning engineer. Passionate about turning data into actionable insights.",
+        "image": DEMO_DATA_DEFAULT_IMAGE,
+    },
+)
+
+# author_id is an index in _DEMO_USERS_DATA
+_DEMO_ARTICLES_DATA = (
+    {
+        "slug": "how-to-learn-javascript-efficiently",
+        "title": "How to Learn JavaScript Efficiently",
+        "description": "A comprehensive guide to mastering JavaScript from beginner to advanced level",
+        "body": "Learning JavaScript can be overwhelming with so many resources available. Here's a structured approach that has helped thousands of developers master this essential language.\n\n## Start with the Fundamentals\n\nBefore diving into frameworks, master the core concepts: variables, functions, objects, and arrays. Understanding these building blocks is crucial for writing clean, maintainable code.\n\n## Practice with Real Projects\n\nThe best way to learn is by building actual applications. Start with simple projects like a todo list or calculator, then gradually increase complexity.\n\n## Join the Community\n\nEngage with other developers through forums, Discord servers, and local meetups. The JavaScript community is incredibly welcoming and helpful.",
+        "tagList": ["javascript", "programming", "webdev", "beginners"],
+        "author_id": 0,
+    },
+    {
+        "slug": "react-hooks-best-practices",
+        "title": "React Hooks: Best Practices and Common Pitfalls",
+        "description": "Essential patterns and anti-patterns when working with React Hooks",
+        "body": "React Hooks have revolutionized how we write React components, but they come with their own set of best practices and potential pitfalls.\n\n## useEffect Dependencies\n\nOne of the most common mistakes is forgetting to include dependencies in the useEffect array. This can lead to stale closures and unexpected behavior.\n\n## Custom Hooks for Reusability\n\nCreate custom hooks to encapsulate stateful logic that can be shared across components. This promotes code reuse and maintainability.\n\n## Performance Considerations\n\nUse useMemo and useCallback judiciously. Don't optimize prematurely, but be aware of when these hooks can help prevent unnecessary re-renders.",
+        "tagList": ["react", "hooks", "javascript", "frontend"],
+        "author_id": 1,
+    },
+    {
+        "slug": "building-scalable-apis-with-node-js",
+        "title": "Building Scalable APIs with Node.js",
+        "description": "Architectural patterns and best practices for creating robust backend services",
+        "body": "Building scalable APIs requires careful consideration of architecture, error handling, and performance optimization.\n\n## API Design Principles\n\nFollow RESTful conventions and use appropriate HTTP status codes. Design your API to be intuitive and self-documenting.\n\n## Error Handling Strategy\n\nImplement comprehensive error handling with proper logging and monitoring. Use middleware to handle errors consistently across your application.\n\n## Database Optimization\n\nOptimize database queries and consider implementing caching strategies for frequently accessed data. Connection pooling is essential for production applications.",
+        "tagList": ["nodejs", "api", "backend", "architecture"],
+        "author_id": 2,
+    },
+    {
+        "slug": "introduction-to-machine-learning-for-developers",
+        "title": "Introduction to Machine Learning for Developers",
+        "description": "Getting started with ML concepts and practical applications for software developers",
+        "body": "Machine learning might seem intimidating, but it's more accessible than ever for developers looking to expand their skillset.\n\n## Understanding the Basics\n\nStart with supervised learning concepts like classification and regression. These form the foundation for more complex ML algorithms.\n\n## Practical Tools and Libraries\n\nPython's scikit-learn is perfect for beginners, while TensorFlow and PyTorch offer more advanced capabilities for deep learning projects.\n\n## Data Preprocessing\n\nMost of ML work involves cleaning and preparing data. Learn to handle missing values, normalize features, and split datasets properly.",
+        "tagList": ["machinelearning", "python", "ai", "datascience"],
+        "author_id": 3,
+    },
+)
+
+# article_id and author_id are indexes in _DEMO_ARTICLES_DATA and _DEMO_USERS_DATA
+_DEMO_COMMENTS_DATA = (
+    {
+        "body": "Great article! I've been struggling with JavaScript concepts and this really helps clarify things.",
+        "article_id": 0,
+        "author_id": 1,
+    },
+    {
+        "body": "The project-based approach really works. I built three projects following this guide and learned so much!",
+        "article_id": 0,
+        "author_id": 2,
+    },
+    {
+        "body": "useEffect dependencies caught me so many times when I was learning React. Wish I had read this earlier!",
+        "article_id": 1,
+        "author_id": 0,
+    },
+    {
+        "body": "Custom hooks are a game-changer. They make components so much cleaner and more reusable.",
+        "article_id": 1,
+        "author_id": 3,
+    },
+    {
+        "body": "Error handling is definitely something I need to improve on. Thanks for the practical tips!",
+        "article_id": 2,
+        "author_id": 1,
+    },
+    {
+        "body": "Connection pooling made such a difference in my API performance. Great advice!",
+        "article_id": 2,
+        "author_id": 0,
+    },
+    {
+        "body": "As someone new to ML, this is exactly the kind of practical introduction I was looking for.",
+        "article_id": 3,
+        "author_id": 1,
+    },
+    {
+        "body": "The data preprocessing section is spot on. It's definitely where most of the work happens in ML projects.",
+        "article_id": 3,
+        "author_id": 2,
+    },
+)
+
+# John follows Jane and Mike, Jane follows Sarah, Mike follows John and Sarah
+_DEMO_FOLLOWS = ((0, 1), (0, 2), (1, 3), (2, 0), (2, 3))  # (follower, followed) indexes in _DEMO_USERS_DATA
+# John favorites Jane's and Sarah's articles, Jane favorites Mike's article,
+# Mike favorites John's article, Sarah favorites John's and Jane's articles
+_DEMO_FAVORITES = ((0, 1), (0, 3), (1, 2), (2, 0), (3, 0), (3, 1))  # (user, article) indexes
+
+
 def populate_demo_data(storage: "InMemoryStorage"):
     """Populate InMemoryStorage with demo data for testing/demo purposes"""
     current_time = get_current_time()
-    # Create demo users
-    users_data = [
-        {
-            "email": "john.doe@example.com",
-            "username": "johndoe",
-            "password": hash_password("password123"),
-            "bio": "Full-stack developer passionate about clean code and innovative solutions. Love working with modern web technologies.",
-            "image": DEMO_DATA_DEFAULT_IMAGE,
-            "createdAt": current_time,
-        },
-        {
-            "email": "jane.smith@example.com",
-            "username": "janesmith",
-            "password": hash_password("password123"),
-            "bio": "Frontend developer with a keen eye for UI/UX design. Specializing in React and modern CSS frameworks.",
-            "image": DEMO_DATA_DEFAULT_IMAGE,
-            "createdAt": current_time,
-        },
-        {
-            "email": "mike.wilson@example.com",
-            "username": "mikewilson",
-            "password": hash_password("password123"),
-            "bio": "Backend engineer focused on scalable architecture and DevOps. Enthusiast of cloud technologies and automation.",
-            "image": DEMO_DATA_DEFAULT_IMAGE,
-            "createdAt": current_time,
-        },
-        {
-            "email": "sarah.chen@example.com",
-            "username": "sarahchen",
-            "password": hash_password("password123"),
-            "bio": "Data scientist and machine learning engineer. Passionate about turning data into actionable insights.",
-            "image": DEMO_DATA_DEFAULT_IMAGE,
-            "createdAt": current_time,
-        },
-    ]
     # Add users and store their IDs
-    user_ids = []
-    for user_data in users_data:
-        user = storage.users.add(user_data)
-        user_ids.append(user["id"])
-    # Create demo articles
-    articles_data = [
-        {
-            "slug": "how-to-learn-javascript-efficiently",
-            "title": "How to Learn JavaScript Efficiently",
-            "description": "A comprehensive guide to mastering JavaScript from beginner to advanced level",
-            "body": "Learning JavaScript can be overwhelming with so many resources available. Here's a structured approach that has helped thousands of developers master this essential language.\n\n## Start with the Fundamentals\n\nBefore diving into frameworks, master the core concepts: variables, functions, objects, and arrays. Understanding these building blocks is crucial for writing clean, maintainable code.\n\n## Practice with Real Projects\n\nThe best way to learn is by building actual applications. Start with simple projects like a todo list or calculator, then gradually increase complexity.\n\n## Join the Community\n\nEngage with other developers through forums, Discord servers, and local meetups. The JavaScript community is incredibly welcoming and helpful.",
-            "tagList": ["javascript", "programming", "webdev", "beginners"],
-            "author_id": user_ids[0],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-        {
-            "slug": "react-hooks-best-practices",
-            "title": "React Hooks: Best Practices and Common Pitfalls",
-            "description": "Essential patterns and anti-patterns when working with React Hooks",
-            "body": "React Hooks have revolutionized how we write React components, but they come with their own set of best practices and potential pitfalls.\n\n## useEffect Dependencies\n\nOne of the most common mistakes is forgetting to include dependencies in the useEffect array. This can lead to stale closures and unexpected behavior.\n\n## Custom Hooks for Reusability\n\nCreate custom hooks to encapsulate stateful logic that can be shared across components. This promotes code reuse and maintainability.\n\n## Performance Considerations\n\nUse useMemo and useCallback judiciously. Don't optimize prematurely, but be aware of when these hooks can help prevent unnecessary re-renders.",
-            "tagList": ["react", "hooks", "javascript", "frontend"],
-            "author_id": user_ids[1],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-        {
-            "slug": "building-scalable-apis-with-node-js",
-            "title": "Building Scalable APIs with Node.js",
-            "description": "Architectural patterns and best practices for creating robust backend services",
-            "body": "Building scalable APIs requires careful consideration of architecture, error handling, and performance optimization.\n\n## API Design Principles\n\nFollow RESTful conventions and use appropriate HTTP status codes. Design your API to be intuitive and self-documenting.\n\n## Error Handling Strategy\n\nImplement comprehensive error handling with proper logging and monitoring. Use middleware to handle errors consistently across your application.\n\n## Database Optimization\n\nOptimize database queries and consider implementing caching strategies for frequently accessed data. Connection pooling is essential for production applications.",
-            "tagList": ["nodejs", "api", "backend", "architecture"],
-            "author_id": user_ids[2],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-        {
-            "slug": "introduction-to-machine-learning-for-developers",
-            "title": "Introduction to Machine Learning for Developers",
-            "description": "Getting started with ML concepts and practical applications for software developers",
-            "body": "Machine learning might seem intimidating, but it's more accessible than ever for developers looking to expand their skillset.\n\n## Understanding the Basics\n\nStart with supervised learning concepts like classification and regression. These form the foundation for more complex ML algorithms.\n\n## Practical Tools and Libraries\n\nPython's scikit-learn is perfect for beginners, while TensorFlow and PyTorch offer more advanced capabilities for deep learning projects.\n\n## Data Preprocessing\n\nMost of ML work involves cleaning and preparing data. Learn to handle missing values, normalize features, and split datasets properly.",
-            "tagList": ["machinelearning", "python", "ai", "datascience"],
-            "author_id": user_ids[3],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-    ]
+    users = storage.users.bulk_add([{**user_data, "createdAt": current_time} for user_data in _DEMO_USERS_DATA])
+    user_ids = [user["id"] for user in users]
     # Add articles and store their IDs
-    article_ids = []
-    for article_data in articles_data:
-        article = storage.articles.add(article_data)
-        article_ids.append(article["id"])
-    # Create demo comments
-    comments_data = [
-        {
-            "body": "Great article! I've been struggling with JavaScript concepts and this really helps clarify things.",
-            "article_id": article_ids[0],
-            "author_id": user_ids[1],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-        {
-            "body": "The project-based approach really works. I built three projects following this guide and learned so much!",
-            "article_id": article_ids[0],
-            "author_id": user_ids[2],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-        {
-            "body": "useEffect dependencies caught me so many times when I was learning React. Wish I had read this earlier!",
-            "article_id": article_ids[1],
-            "author_id": user_ids[0],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-        {
-            "body": "Custom hooks are a game-changer. They make components so much cleaner and more reusable.",
-            "article_id": article_ids[1],
-            "author_id": user_ids[3],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-        {
-            "body": "Error handling is definitely something I need to improve on. Thanks for the practical tips!",
-            "article_id": article_ids[2],
-            "author_id": user_ids[1],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-        {
-            "body": "Connection pooling made such a difference in my API performance. Great advice!",
-            "article_id": article_ids[2],
-            "author_id": user_ids[0],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-        {
-            "body": "As someone new to ML, this is exactly the kind of practical introduction I was looking for.",
-            "article_id": article_ids[3],
-            "author_id": user_ids[1],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-        {
-            "body": "The data preprocessing section is spot on. It's definitely where most of the work happens in ML projects.",
-            "article_id": article_ids[3],
-            "author_id": user_ids[2],
-            "createdAt": current_time,
-            "updatedAt": current_time,
-        },
-    ]
+    articles = storage.articles.bulk_add(
+        [
+            {
+                **article_data,
+                "tagList": list(article_data["tagList"]),
+                "author_id": user_ids[article_data["author_id"]],
+                "createdAt": current_time,
+                "updatedAt": current_time,
+            }
+            for article_data in _DEMO_ARTICLES_DATA
+        ]
+    )
+    article_ids = [article["id"] for article in articles]
     # Add comments
-    for comment_data in comments_data:
-        storage.comments.add(comment_data)
-    # Create some follow relationships
-    # John follows Jane and Mike
-    storage.follows.add(user_ids[0], user_ids[1])
-    storage.follows.add(user_ids[0], user_ids[2])
-    # Jane follows Sarah
-    storage.follows.add(user_ids[1], user_ids[3])
-    # Mike follows John and Sarah
-    storage.follows.add(user_ids[2], user_ids[0])
-    storage.follows.add(user_ids[2], user_ids[3])
-    # Create some favorite relationships
-    # John favorites Jane's and Sarah's articles
-    storage.favorites.add(user_ids[0], article_ids[1])
-    storage.favorites.add(user_ids[0], article_ids[3])
-    # Jane favorites Mike's article
-    storage.favorites.add(user_ids[1], article_ids[2])
-    # Mike favorites John's article
-    storage.favorites.add(user_ids[2], article_ids[0])
-    # Sarah favorites John's and Jane's articles
-    storage.favorites.add(user_ids[3], article_ids[0])
-    storage.favorites.add(user_ids[3], article_ids[1])
+    storage.comments.bulk_add(
+        [
+            {
+                **comment_data,
+                "article_id": article_ids[comment_data["article_id"]],
+                "author_id": user_ids[comment_data["author_id"]],
+                "createdAt": current_time,
+                "updatedAt": current_time,
+            }
+            for comment_data in _DEMO_COMMENTS_DATA
+        ]
+    )
+    # Create some follow and favorite relationships
+    for follower, followed in _DEMO_FOLLOWS:
+        storage.follows._add_norm(user_ids[follower], user_ids[followed])
+    for user, article in _DEMO_FAVORITES:
+        storage.favorites._add_norm(user_ids[user], article_ids[article])
 
 
 #### IMPLEMENTATION ####################################################################################################
 
 
 def normalize_id(value):
-    if type(value) is int:
+    # str first as ids are str almost everywhere, exact type checks as isinstance would let bool (an int) through
+    if type(value) is not str:
+        if type(value) is not int:
+            raise ValueError("id must be an int or an str")
         value = str(value)
-    if type(value) is str:
-        if len(value) > MAX_ID_LEN:
-            raise ValueError("id is too long")
-        return value
-    raise ValueError("id must be an int or an str")
+    if len(value) > MAX_ID_LEN:
+        raise ValueError("id is too long")
+    return value
+
+
+@lru_cache(maxsize=8192)  # called on every session operation, for a rather small set of recurring client ips
+def normalize_ip_for_limiting(ip):
+    """Normalize IP for session limiting - IPv4 as-is, IPv6 to /64 range"""
+    if ip.endswith("/64"):  # makes it safe to call multiple times
+        return ip
+    if ":" not in ip:
+        return ip  # IPv4 as-is
+    try:  # IPv6, limit per /64 subnet, parsed so compressed forms like 2001:db8::1 land in the right one
+        address = ipaddress.IPv6Address(ip)
+    except ValueError:
+        return ip + "/64"  # unsafe but shouldn't happen
+    if address.ipv4_mapped:
+        return str(address.ipv4_mapped)
+    return f"{ipaddress.IPv6Address(int(address) >> 64 << 64).compressed}/64"
 
 
 class InMemoryModel:
@@ -399,22 +485,41 @@ class InMemoryModel:
     won't implement for now as the ROI isn't really there
     """
 
-    def __init__(self, max_count):
+    # one instance per model per session
+    __slots__ = ("_access_order", "_indexes", "_last_get", "_snapshot", "current_id_counter", "max_count", "objects")
+
+    def __init__(self, max_count, indexed_fields=()):
         self.max_count: int = max_count
-        self.objects: Dict[str, object] = {}
-        self.last_accessed_ids: List[str] = []  # perf ok because of the objects per model per session limit
+        self.objects: Dict[str, object] = {}  # insertion order, listings rely on it
+        self._access_order: OrderedDict[str, None] = OrderedDict()  # least recently accessed first
         self.current_id_counter = 1
+        # (id, object) of the last get, as long as it is still the most recently accessed, None otherwise
+        self._last_get: Optional[Tuple[str, object]] = None
+        self._snapshot: Optional[Tuple[dict, ...]] = None  # cached result of snapshot, None once objects change
+        # field -> value -> ids, dicts as ordered sets so lookups keep the objects order
+        self._indexes: Dict[str, Dict[object, Dict[str, None]]] = {field: {} for field in indexed_fields}
         if self.max_count <= 0:
             raise ValueError("invalid value for max_count")
 
+    @property
+    def last_accessed_ids(self) -> List[str]:
+        return list(self._access_order)
+
+    @last_accessed_ids.setter
+    def last_accessed_ids(self, ids):
+        self._access_order = OrderedDict.fromkeys(ids)
+        self._last_get = None
+        self._snapshot = None  # also set after objects are replaced or restored, see copy_from and load_data
+
     def add(self, obj):
         if len(str(self.current_id_counter)) > MAX_ID_LEN:
             raise ValueError("cannot allocate id: we reached MAX_ID_LEN limit")
         self.objects[str(self.current_id_counter)] = obj
         obj["id"] = str(self.current_id_counter)
         self.current_id_counter += 1
+        self._index(obj)
         if len(self.objects) > self.max_count:
-            evicted_id = self.last_accessed_ids[0]
+            evicted_id, _ = self._access_order.popitem(last=False)
             log_structured(
                 security_logger,
                 logging.WARNING,
@@ -424,10 +529,10 @@ class InMemoryModel:
                 evicted_id=evicted_id,
                 new_id=obj["id"],
             )
-            del self.objects[evicted_id]
-            self.last_accessed_ids = self.last_accessed_ids[1:] + [obj["id"]]
-        else:
-            self.last_accessed_ids.append(obj["id"])
+            self._unindex(self.objects.pop(evicted_id))
+        self._access_order[obj["id"]] = None
+        self._last_get = None
+        self._snapshot = None
         log_structured(
             storage_logger,
             logging.DEBUG,
@@ -438,18 +543,109 @@ class InMemoryModel:
         )
         return obj
 
-    def get(self, _id):
-        _id = normalize_id(_id)
-        if _id not in self.objects:
+    def bulk_add(self, objs):
+        """Same result as calling add on each object, with one capacity check and one log entry for the batch"""
+        first_id = self.current_id_counter
+        if len(str(first_id + len(objs) - 1)) > MAX_ID_LEN:
+            raise ValueError("cannot allocate id: we reached MAX_ID_LEN limit")
+        objects, access_order = self.objects, self._access_order
+        for _id, obj in enumerate(objs, first_id):
+            _id = str(_id)
+            objects[_id] = obj
+            obj["id"] = _id
+            access_order[_id] = None
+            self._index(obj)
+        self.current_id_counter = first_id + len(objs)
+        self._last_get = None
+        self._snapshot = None
+        while len(objects) > self.max_count:
+            evicted_id, _ = access_order.popitem(last=False)
             log_structured(
-                storage_logger, logging.DEBUG, "get - object not found", operation="get", object_id=_id, found=False
+                security_logger,
+                logging.WARNING,
+                "Rate limit reached - Object storage full, evicting oldest object",
+                rate_limit_type="object_storage",
+                max_count=self.max_count,
+                evicted_id=evicted_id,
             )
-            return None
-        self.last_accessed_ids = [*(e for e in self.last_accessed_ids if e != _id), _id]
+            self._unindex(objects.pop(evicted_id))
+        log_structured(
+            storage_logger,
+            logging.DEBUG,
+            "objects added",
+            operation="bulk_add",
+            added_count=len(objs),
+            total_objects=len(objects),
+        )
+        return objs
+
+    def get(self, _id):
+        _id = normalize_id(_id)
+        last_get = self._last_get
+        if last_get is not None and last_get[0] == _id:  # same object fetched again, already at the most recent end
+            obj = last_get[1]
+        else:
+            obj = self.objects.get(_id)
+            if obj is None:
+                log_structured(
+                    storage_logger, logging.DEBUG, "get - object not found", operation="get", object_id=_id, found=False
+                )
+                return None
+            self._access_order[_id] = None  # no-op if already tracked, then moved to the most recent end
+            self._access_order.move_to_end(_id)
+            self._last_get = (_id, obj)
         log_structured(
             storage_logger, logging.DEBUG, "get - object retrieved", operation="get", object_id=_id, found=True
         )
-        return self.objects[_id]
+        return obj
+
+    def _index(self, obj):
+        for field, index in self._indexes.items():
+            value = obj.get(field)
+            for key in dict.fromkeys(value) if type(value) is list else (value,):  # list fields: each element
+                index.setdefault(key, {})[obj["id"]] = None
+
+    def _unindex(self, obj):
+        for field, index in self._indexes.items():
+            value = obj.get(field)
+            for key in dict.fromkeys(value) if type(value) is list else (value,):
+                ids = index[key]
+                del ids[obj["id"]]
+                if not ids:
+                    del index[key]
+
+    def rebuild_indexes(self):
+        """Must be called after objects is replaced or updated directly instead of through add, bulk_add or delete"""
+        self._indexes = {field: {} for field in self._indexes}
+        for obj in self.objects.values():
+            self._index(obj)
+
+    def set_field(self, obj, field, value):
+        """Set a field of a stored object, keeping the index up to date if the field is indexed"""
+        index = self._indexes.get(field)
+        if index is None:
+            obj[field] = value
+            return
+        self._unindex(obj)
+        obj[field] = value
+        self._index(obj)
+
+    def get_ids_by(self, field, value):
+        """Ids of the objects whose indexed field equals value, or contains it for a list field, as a live view"""
+        return self._indexes[field].get(value, {}).keys()
+
+    def indexed_values(self, field):
+        """Distinct values of an indexed field (elements for a list field) held by at least one object, as a live view"""
+        return self._indexes[field].keys()
+
+    def snapshot(self):
+        """
+        Objects sorted newest first by createdAt, cached until the next add, bulk_add or delete
+        The sort is stable, so filtering the snapshot gives the same order as sorting after filtering
+        """
+        if self._snapshot is None:
+            self._snapshot = tuple(sorted(self.objects.values(), key=lambda x: x["createdAt"], reverse=True))
+        return self._snapshot
 
     def keys(self):
         return self.objects.keys()
@@ -463,8 +659,10 @@ class InMemoryModel:
     def delete(self, _id):
         _id = normalize_id(_id)
         if _id in self.objects:
-            del self.objects[_id]
-            self.last_accessed_ids = [cid for cid in self.last_accessed_ids if cid != _id]
+            self._unindex(self.objects.pop(_id))
+            self._access_order.pop(_id, None)
+            self._last_get = None
+            self._snapshot = None
             log_structured(
                 storage_logger,
                 logging.DEBUG,
@@ -486,19 +684,54 @@ class InMemoryModel:
 
 
 class InMemoryLinks:
+    __slots__ = ("_by_source", "_by_target", "_pairs", "max_count")
+
     def __init__(self, max_count):
         self.max_count: int = max_count
-        self.links: List[Tuple[int, int]] = []  # cheaper implem to limit global number of links and wipe oldest
+        # cheaper implem to limit global number of links and wipe oldest: ordered oldest first, indexed both ways
+        self._pairs: OrderedDict[Tuple[str, str], None] = OrderedDict()
+        self._by_source: Dict[str, Dict[str, None]] = {}  # dicts as ordered sets, so lookups keep the links order
+        self._by_target: Dict[str, Dict[str, None]] = {}
+
+    def __len__(self):
+        return len(self._pairs)
+
+    @property
+    def links(self) -> List[Tuple[str, str]]:
+        return list(self._pairs)
+
+    @links.setter
+    def links(self, links):
+        self._pairs, self._by_source, self._by_target = OrderedDict(), {}, {}
+        for source, target in links:
+            self._pairs[(source, target)] = None
+            self._index(source, target)
+
+    def _index(self, source, target):
+        self._by_source.setdefault(source, {})[target] = None
+        self._by_target.setdefault(target, {})[source] = None
+
+    def _unindex(self, source, target):
+        targets, sources = self._by_source[source], self._by_target[target]
+        del targets[target], sources[source]
+        if not targets:
+            del self._by_source[source]
+        if not sources:
+            del self._by_target[target]
+
+    # The _norm variants skip normalize_id, for internal callers whose ids already come from obj["id"]
 
     def add(self, source, target):
-        source, target = normalize_id(source), normalize_id(target)
+        self._add_norm(normalize_id(source), normalize_id(target))
+
+    def _add_norm(self, source, target):
         if self.max_count == 0:
             return
-        _index = self.links.index((source, target)) if (source, target) in self.links else None
-        if _index is not None:
-            self.links = [*self.links[:_index], *self.links[_index + 1 :], (source, target)]
-        elif len(self.links) >= self.max_count:
-            evicted_link = self.links[0] if self.links else None
+        if (source, target) in self._pairs:
+            self._pairs.move_to_end((source, target))
+            self._unindex(source, target)
+        elif len(self._pairs) >= self.max_count:
+            evicted_link = next(iter(self._pairs))
             log_structured(
                 security_logger,
                 logging.WARNING,
@@ -508,44 +741,113 @@ class InMemoryLinks:
                 evicted_link=evicted_link,
                 new_link=(source, target),
             )
-            self.links = [*self.links[1:], (source, target)]
-        else:
-            self.links = [*self.links, (source, target)]
+            self._pairs.popitem(last=False)
+            self._unindex(*evicted_link)
+        self._pairs[(source, target)] = None
+        self._index(source, target)
 
     def remove(self, source, target):
-        source, target = normalize_id(source), normalize_id(target)
-        _index = self.links.index((source, target)) if (source, target) in self.links else None
-        if _index is not None:
-            self.links = [*self.links[:_index], *self.links[_index + 1 :]]
+        self._remove_norm(normalize_id(source), normalize_id(target))
+
+    def _remove_norm(self, source, target):
+        if (source, target) in self._pairs:
+            del self._pairs[(source, target)]
+            self._unindex(source, target)
 
     def is_linked(self, source, target):
-        source, target = normalize_id(source), normalize_id(target)
-        return (source, target) in self.links
+        return (normalize_id(source), normalize_id(target)) in self._pairs
+
+    def _is_linked_norm(self, source, target):
+        return (source, target) in self._pairs
 
     def targets_for_source(self, wanted_source):
-        return [target for source, target in self.links if source == normalize_id(wanted_source)]
+        return self._targets_for_source_norm(normalize_id(wanted_source))
+
+    def _targets_for_source_norm(self, wanted_source):
+        return list(self._by_source.get(wanted_source, ()))
 
     def sources_for_target(self, wanted_target):
-        return [source for source, target in self.links if target == normalize_id(wanted_target)]
+        return self._sources_for_target_norm(normalize_id(wanted_target))
+
+    def _sources_for_target_norm(self, wanted_target):
+        return list(self._by_target.get(wanted_target, ()))
+
+    def count_sources_for_target(self, wanted_target):
+        return self._count_sources_for_target_norm(normalize_id(wanted_target))
+
+    def _count_sources_for_target_norm(self, wanted_target):
+        return len(self._by_target.get(wanted_target, ()))  # the index size is the count, no list copy
 
     def delete_source(self, source_to_delete):
-        self.links = [(source, target) for source, target in self.links if source != normalize_id(source_to_delete)]
+        source_to_delete = normalize_id(source_to_delete)
+        for target in self._by_source.pop(source_to_delete, ()):
+            del self._pairs[(source_to_delete, target)]
+            sources = self._by_target[target]
+            del sources[source_to_delete]
+            if not sources:
+                del self._by_target[target]
 
     def delete_target(self, target_to_delete):
-        self.links = [(source, target) for source, target in self.links if target != normalize_id(target_to_delete)]
+        target_to_delete = normalize_id(target_to_delete)
+        for source in self._by_target.pop(target_to_delete, ()):
+            del self._pairs[(source, target_to_delete)]
+            targets = self._by_source[source]
+            del targets[target_to_delete]
+            if not targets:
+                del self._by_source[source]
 
 
 class InMemoryStorage:
     """In-memory storage for all data"""
 
-    def __init__(self):
-        self.users = InMemoryModel(max_count=MAX_USERS_PER_SESSION)
-        self.articles = InMemoryModel(max_count=MAX_ARTICLES_PER_SESSION)
-        self.comments = InMemoryModel(max_count=MAX_COMMENTS_PER_SESSION)
+    __slots__ = ("articles", "comments", "favorites", "follows", "users")
+
+    def __init__(self, with_demo_data=None):
+        self.users = InMemoryModel(max_count=MAX_USERS_PER_SESSION, indexed_fields=("token", "email", "username"))
+        self.articles = InMemoryModel(
+            max_count=MAX_ARTICLES_PER_SESSION, indexed_fields=("author_id", "slug", "tagList")
+        )
+        self.comments = InMemoryModel(max_count=MAX_COMMENTS_PER_SESSION, indexed_fields=("article_id",))
         self.follows = InMemoryLinks(max_count=MAX_FOLLOWS_PER_SESSION)  # user_id -> followed user_ids
         self.favorites = InMemoryLinks(max_count=MAX_FAVORITES_PER_SESSION)  # user_id -> favorited article_ids
-        if POPULATE_DEMO_DATA:
-            populate_demo_data(self)
+        if with_demo_data is None:
+            with_demo_data = POPULATE_DEMO_DATA
+        if with_demo_data:
+            self.copy_from(get_demo_data_template())
+
+    def copy_from(self, other: "InMemoryStorage"):
+        """Replace the content with a copy of another storage, objects are copied so sessions stay isolated"""
+        current_time = get_current_time()
+        for name in ("users", "articles", "comments"):
+            source, model = getattr(other, name), getattr(self, name)
+            # Shallow copies are enough: nested values such as tagList are replaced on update, never mutated
+            model.objects = {
+                _id: {**obj, **{field: current_time for field in ("createdAt", "updatedAt") if field in obj}}
+                for _id, obj in source.objects.items()
+            }
+            model.last_accessed_ids = source.last_accessed_ids
+            model.current_id_counter = source.current_id_counter
+            model.rebuild_indexes()
+        self.follows.links = other.follows.links
+        self.favorites.links = other.favorites.links
+
+    def size_hint(self) -> int:
+        """Number of stored objects and links, a cheap estimate of how much a session holds"""
+        return (
+            len(self.users.objects)
+            + len(self.articles.objects)
+            + len(self.comments.objects)
+            + len(self.follows)
+            + len(self.favorites)
+        )
+
+
+@lru_cache(maxsize=1)
+def get_demo_data_template() -> InMemoryStorage:
+    """Demo data is populated once, then each new session gets a copy instead of re-running populate_demo_data"""
+    template = InMemoryStorage(with_demo_data=False)
+    populate_demo_data(template)
+    return template
 
 
 class _StorageContainer:
@@ -557,18 +859,38 @@ class _StorageContainer:
     make this implementation an acceptable choice
     """
 
+    __slots__ = (
+        "DISABLE_ISOLATION_MODE",
+        "EVICTION_CANDIDATES",
+        "MAX_SESSIONS",
+        "heap",
+        "index_map",
+        "ip_to_sessions",
+        "jwt_to_session",
+        "session_to_jwt",
+    )
+
     # init
 
-    def __init__(self, disable_isolation_mode=DISABLE_ISOLATION_MODE, max_sessions=MAX_SESSIONS):
+    def __init__(
+        self,
+        disable_isolation_mode=DISABLE_ISOLATION_MODE,
+        max_sessions=MAX_SESSIONS,
+        eviction_candidates=SESSION_EVICTION_CANDIDATES,
+    ):
         self.DISABLE_ISOLATION_MODE = disable_isolation_mode
         self.MAX_SESSIONS = max_sessions
+        self.EVICTION_CANDIDATES = eviction_candidates
         self.heap = []  # list of (priority, obj_id, data, index, client_ip)
         self.index_map = {}  # session_id -> heap index
-        self.jwt_to_session = {}  # jwt_token -> session -- it's a bijective relation; maybe multiple sessions -> data
-        self.jwt_to_session_order = []  # list of jwt_token
-        self.ip_to_sessions = {}  # ip -> list of session_ids
+        # jwt_token -> session, least recently used first -- it's a bijective relation; maybe multiple sessions -> data
+        self.jwt_to_session: OrderedDict[str, str] = OrderedDict()
+        self.session_to_jwt: Dict[str, str] = {}  # reverse of jwt_to_session
+        self.ip_to_sessions = {}  # ip -> session_ids, dicts as ordered sets: O(1) removal, oldest first for eviction
         if not MAX_SESSIONS_PER_IP or MAX_SESSIONS_PER_IP < 1:
             raise ValueError(f"MAX_SESSIONS_PER_IP is set to {MAX_SESSIONS_PER_IP}, you need at least one")
+        if not 1 <= eviction_candidates <= 10:  # candidates are searched in the top levels of the heap, keep it small
+            raise ValueError(f"SESSION_EVICTION_CANDIDATES is set to {eviction_candidates}, keep it between 1 and 10")
 
     # heap + index_map operations -> call _handle_client_ip_and_session helpers as side-effect
 
@@ -610,29 +932,38 @@ class _StorageContainer:
             self._sift_down(index)
 
     def _sift_up(self, index):
-        """Restore heap property upward"""
+        """Restore heap property upward, moving parents down into the hole like heapq does instead of swapping"""
+        heap, index_map = self.heap, self.index_map
+        item = heap[index]
+        priority = item[0]
         while index > 0:
-            parent_index = (index - 1) // 2
-            if self.heap[index][0] >= self.heap[parent_index][0]:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            if priority >= parent[0]:
                 break
-            # Swap items
-            self._swap(index, parent_index)
+            heap[index], parent[3], index_map[parent[1]] = parent, index, index
             index = parent_index
+        heap[index], item[3], index_map[item[1]] = item, index, index
 
     def _sift_down(self, index):
-        """Restore heap property downward"""
+        """Restore heap property downward, moving the smallest child up into the hole like heapq does"""
+        heap, index_map = self.heap, self.index_map
+        size = len(heap)
+        item = heap[index]
+        priority = item[0]
         while True:
-            smallest = index
-            left_child = 2 * index + 1
-            right_child = 2 * index + 2
-            if left_child < len(self.heap) and self.heap[left_child][0] < self.heap[smallest][0]:
-                smallest = left_child
-            if right_child < len(self.heap) and self.heap[right_child][0] < self.heap[smallest][0]:
-                smallest = right_child
-            if smallest == index:
+            child_index = 2 * index + 1
+            if child_index >= size:
+                break
+            child = heap[child_index]
+            right_index = child_index + 1
+            if right_index < size and heap[right_index][0] < child[0]:
+                child_index, child = right_index, heap[right_index]
+            if not child[0] < priority:
                 break
-            self._swap(index, smallest)
-            index = smallest
+            heap[index], child[3], index_map[child[1]] = child, index, index
+            index = child_index
+        heap[index], item[3], index_map[item[1]] = item, index, index
 
     def _swap(self, i, j):
         """Swap two items and update their indices"""
@@ -644,12 +975,7 @@ class _StorageContainer:
 
     def _normalize_ip_for_limiting(self, ip):
         """Normalize IP for session limiting - IPv4 as-is, IPv6 to /64 range"""
-        if ip.endswith("/64"):  # makes it safe to call multiple times
-            return ip
-        if ":" in ip:  # IPv6, limit per /64 subnet (first 4 groups)
-            parts = ip.split(":")
-            return ":".join(parts[:4]) + "::/64" if len(parts) >= 4 else ip + "/64"  # unsafe but shouldn't happen
-        return ip  # IPv4 as-is
+        return normalize_ip_for_limiting(ip)
 
     def _handle_client_ip_and_session_eviction(self, identifier, client_ip):
         """Helper that cleanly removes a session from ip_to_sessions: removes the ip entirely if it becomes empty"""
@@ -665,8 +991,8 @@ class _StorageContainer:
         normalized_ip = self._normalize_ip_for_limiting(client_ip)
         if normalized_ip in self.ip_to_sessions:
             sessions_before = len(self.ip_to_sessions[normalized_ip])
-            self.ip_to_sessions[normalized_ip] = [e for e in self.ip_to_sessions[normalized_ip] if e != identifier]
-            if not self.ip_to_sessions[normalized_ip]:  # Remove empty lists
+            self.ip_to_sessions[normalized_ip].pop(identifier, None)
+            if not self.ip_to_sessions[normalized_ip]:  # Remove empty entries
                 del self.ip_to_sessions[normalized_ip]
                 log_structured(
                     session_management_logger,
@@ -710,7 +1036,7 @@ class _StorageContainer:
             return
         normalized_ip = self._normalize_ip_for_limiting(client_ip)
         if normalized_ip not in self.ip_to_sessions:
-            self.ip_to_sessions[normalized_ip] = [identifier]
+            self.ip_to_sessions[normalized_ip] = {identifier: None}
             log_structured(
                 session_management_logger,
                 logging.DEBUG,
@@ -720,14 +1046,15 @@ class _StorageContainer:
                 normalized_ip=normalized_ip,
             )
             return
-        sessions_before = len(self.ip_to_sessions[normalized_ip])
-        self.ip_to_sessions[normalized_ip].append(identifier)
+        sessions = self.ip_to_sessions[normalized_ip]
+        sessions_before = len(sessions)
+        sessions[identifier] = None
         sessions_removed = 0
-        while len(self.ip_to_sessions[normalized_ip]) > MAX_SESSIONS_PER_IP:
-            session_id_to_remove = self.ip_to_sessions[normalized_ip][0]
+        while len(sessions) > MAX_SESSIONS_PER_IP:
+            session_id_to_remove = next(iter(sessions))
             self._update_priority(session_id_to_remove, 0)
             self._pop()
-            self.ip_to_sessions[normalized_ip] = self.ip_to_sessions[normalized_ip][1:]
+            del sessions[session_id_to_remove]
             sessions_removed += 1
         log_structured(
             session_management_logger,
@@ -758,7 +1085,7 @@ class _StorageContainer:
         _, _, _, _, saved_client_ip = self.heap[self.index_map[session_id]]
         if saved_client_ip == normalized_ip:
             if normalized_ip not in self.ip_to_sessions:  # shouldn't happen but safer to handle it anyway
-                self.ip_to_sessions[normalized_ip] = [session_id]
+                self.ip_to_sessions[normalized_ip] = {session_id: None}
                 log_structured(
                     session_management_logger,
                     logging.DEBUG,
@@ -768,12 +1095,10 @@ class _StorageContainer:
                     normalized_ip=normalized_ip,
                 )
                 return
-            sessions_before = len(self.ip_to_sessions[normalized_ip])
-            self.ip_to_sessions[normalized_ip] = [
-                e
-                for e in self.ip_to_sessions[normalized_ip]
-                if e != session_id  # still safe if not present
-            ] + [session_id]  # we should never exceed MAX_SESSIONS_PER_IP as this session is supposed to be here though
+            sessions = self.ip_to_sessions[normalized_ip]
+            sessions_before = len(sessions)
+            sessions.pop(session_id, None)  # still safe if not present
+            sessions[session_id] = None  # should never exceed MAX_SESSIONS_PER_IP as this session is supposed to be here
             log_structured(
                 session_management_logger,
                 logging.DEBUG,
@@ -784,50 +1109,30 @@ class _StorageContainer:
                 sessions_count=sessions_before,
             )
             return
-        log_structured(
-            session_management_logger,
-            logging.DEBUG,
-            "Client IP and session priority - triggering reattribution",
-            session_id=session_id,
-            client_ip=client_ip,
-            normalized_ip=normalized_ip,
-            saved_client_ip=saved_client_ip,
-        )
-        self._handle_client_ip_and_session_reattribution(session_id, saved_client_ip, normalized_ip)
+        self._handle_client_ip_and_session_reattribution(session_id, saved_client_ip, normalized_ip)  # logs it
 
     def _handle_client_ip_and_session_reattribution(self, session_id, normalized_saved_ip, normalized_client_ip):
         """expects normalized_client_ip and normalized_saved_ip to both be defined, and different"""
-        log_structured(
-            session_management_logger,
-            logging.DEBUG,
-            "Client IP and session reattribution started",
-            session_id=session_id,
-            normalized_saved_ip=normalized_saved_ip,
-            normalized_client_ip=normalized_client_ip,
-        )
         self.heap[self.index_map[session_id]][4] = normalized_client_ip  # update the client_ip in the data struct
         saved_ip_removed = False
         saved_ip_sessions_before, saved_ip_sessions_after = None, None
         if normalized_saved_ip and normalized_saved_ip in self.ip_to_sessions:
             saved_ip_sessions_before = len(self.ip_to_sessions[normalized_saved_ip])
-            self.ip_to_sessions[normalized_saved_ip] = [
-                e for e in self.ip_to_sessions[normalized_saved_ip] if e != session_id
-            ]
+            self.ip_to_sessions[normalized_saved_ip].pop(session_id, None)
             saved_ip_sessions_after = len(self.ip_to_sessions[normalized_saved_ip])
-            if not self.ip_to_sessions[normalized_saved_ip]:  # Remove empty lists
+            if not self.ip_to_sessions[normalized_saved_ip]:  # Remove empty entries
                 del self.ip_to_sessions[normalized_saved_ip]
                 saved_ip_removed = True
-        client_ip_sessions_before = len(self.ip_to_sessions.get(normalized_client_ip, []))
-        self.ip_to_sessions[normalized_client_ip] = [
-            e
-            for e in self.ip_to_sessions.get(normalized_client_ip, [])
-            if e != session_id  # still safe if not present
-        ] + [session_id]
+        sessions = self.ip_to_sessions.setdefault(normalized_client_ip, {})
+        client_ip_sessions_before = len(sessions)
+        sessions.pop(session_id, None)  # still safe if not present
+        sessions[session_id] = None
         sessions_removed = 0
-        while len(self.ip_to_sessions[normalized_client_ip]) > MAX_SESSIONS_PER_IP:
-            self._update_priority(self.ip_to_sessions[normalized_client_ip][0], 0)
+        while len(sessions) > MAX_SESSIONS_PER_IP:
+            session_id_to_remove = next(iter(sessions))
+            self._update_priority(session_id_to_remove, 0)
             self._pop()
-            self.ip_to_sessions[normalized_client_ip] = self.ip_to_sessions[normalized_client_ip][1:]
+            del sessions[session_id_to_remove]
             sessions_removed += 1
         log_structured(
             session_management_logger,
@@ -877,14 +1182,17 @@ class _StorageContainer:
             session_id_from_token = self.jwt_to_session.get(jwt_token)
             if session_id_from_token and session_id_from_token in self.index_map:
                 target_session_id = session_id_from_token
-                self.jwt_to_session_order = [
-                    *(e for e in self.jwt_to_session_order if e != target_session_id),
-                    jwt_token,
-                ]
+                self.jwt_to_session.move_to_end(jwt_token)
         target_session_id = target_session_id or str(uuid.uuid4())
         storage_container_index = self.index_map.get(target_session_id)
         if storage_container_index is None:  # create the session, push and pop manage the ip
             if len(self.index_map) >= self.MAX_SESSIONS:
+                if self.EVICTION_CANDIDATES > 1:  # the smallest session is the cheapest to lose, oldest first on ties
+                    # the k oldest sessions of a min-heap are within its top k levels, no need to scan the rest
+                    top_levels = self.heap[: (1 << self.EVICTION_CANDIDATES) - 1]
+                    candidates = heapq.nsmallest(self.EVICTION_CANDIDATES, top_levels, key=lambda item: item[:2])
+                    evicted_id = min(candidates, key=lambda item: item[2].size_hint())[1]
+                    self._update_priority(evicted_id, 0)  # brings it to the root, so pop also cleans its ip
                 evicted_session = self.pop()
                 if evicted_session:
                     log_structured(
@@ -924,15 +1232,16 @@ class _StorageContainer:
         Search all sessions for a user with matching email and password
         Returns (session_id, storage) if found, (None, None) otherwise
         This allows login to work across session eviction by finding the user's original session
-        WARNING: Suboptimal, we may want to have a dict + heap mechanism to not reach O(n) with sessions, but goodenough
+        WARNING: Still O(n) with sessions, but each session is checked through its email index, not all of its users
         """
         if self.DISABLE_ISOLATION_MODE:
             return None, None
         for heap_item in self.heap:
             _, session_id, storage, _, _ = heap_item
             # Search for user with matching email and password in this session's storage
-            for user in storage.users.values():
-                if user["email"] == email and user["password"] == hashed_password:
+            for user_id in storage.users.get_ids_by("email", email):
+                user = storage.users.objects[user_id]
+                if user["password"] == hashed_password:
                     log_structured(
                         auth_logger,
                         logging.DEBUG,
@@ -949,19 +1258,22 @@ class _StorageContainer:
         Binds a JWT token to existing session storage
         This method must only be called after a storage has already been retrieved for that session_id
         This method is expected to only be called during the login and registration processes
-        (hence why it is acceptable to let it be algorithmically inefficient)
         """
         if self.DISABLE_ISOLATION_MODE:
             return
-        jwt_tokens_to_remove = {t for t, s in self.jwt_to_session.items() if t == jwt_token or s == session_id}
-        if len(self.jwt_to_session_order) >= self.MAX_SESSIONS:
-            jwt_tokens_to_remove.add(self.jwt_to_session_order[0])
-        self.jwt_to_session_order = [t for t in self.jwt_to_session_order if t not in jwt_tokens_to_remove]
-        for jwt_token_to_remove in jwt_tokens_to_remove:
-            del self.jwt_to_session[jwt_token_to_remove]
+        if len(self.jwt_to_session) >= self.MAX_SESSIONS:  # evict the least recently used binding
+            _, evicted_session_id = self.jwt_to_session.popitem(last=False)
+            del self.session_to_jwt[evicted_session_id]
+        # Remove the previous bindings of this JWT token and of this session, through the reverse map
+        previous_session_id = self.jwt_to_session.pop(jwt_token, None)
+        if previous_session_id is not None:
+            del self.session_to_jwt[previous_session_id]
+        previous_jwt_token = self.session_to_jwt.pop(session_id, None)
+        if previous_jwt_token is not None:
+            del self.jwt_to_session[previous_jwt_token]
         # Bind the JWT token to the session
         self.jwt_to_session[jwt_token] = session_id
-        self.jwt_to_session_order.append(jwt_token)
+        self.session_to_jwt[session_id] = jwt_token
 
 
 storage_container = _StorageContainer()
@@ -976,11 +1288,19 @@ async def lifespan(app: FastAPI):
     save_data()
 
 
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through dumps_response, so straight to bytes by orjson when it is installed"""
+
+    def render(self, content) -> bytes:
+        return dumps_response(content)
+
+
 app = FastAPI(
     title="RealWorld Conduit API",
     version="1.1.0",
     servers=[{"url": "https://api.realworld.show/api"}],
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 app.add_middleware(
     CORSMiddleware,
@@ -993,7 +1313,7 @@ app.add_middleware(
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content=exc.detail if isinstance(exc.detail, dict) else {"errors": {"body": [exc.detail]}},
     )
@@ -1001,7 +1321,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 
 @app.exception_handler(RequestValidationError)
 async def request_validation_exception_handler(request: Request, exc: RequestValidationError):
-    return JSONResponse(status_code=422, content={"errors": {"body": ["Invalid request body"]}})
+    return FastJSONResponse(status_code=422, content={"errors": {"body": ["Invalid request body"]}})
 
 
 # Security scheme for OpenAPI documentation
@@ -1177,10 +1497,12 @@ RESPONSES_401_409_422 = {401: UNAUTHORIZED_RESPONSE, 409: CONFLICT_RESPONSE, 422
 # Dependencies
 def get_client_ip(request: Request) -> str:
     """Get client IP address from header (if configured) or request."""
-    if CLIENT_IP_HEADER:
-        header_value = request.headers.get(CLIENT_IP_HEADER)
-        if header_value:
-            return header_value.split(",")[0].strip()
+    if CLIENT_IP_HEADER_KEY:
+        for key, value in request.scope["headers"]:  # raw headers, the key is lowercased and encoded only once
+            if key == CLIENT_IP_HEADER_KEY:
+                if value:
+                    return value.decode("latin-1").split(",", 1)[0].strip()
+                break
     return request.client.host if request.client else "127.0.0.1"
 
 
@@ -1232,7 +1554,7 @@ def require_auth(ctx: AuthContext) -> AuthContext:
 
 
 def save_data():
-    """Save storage_container data to JSON file - WARNING the current implementation wipes all session to ip data"""
+    """Save storage_container data to JSON file, reading the heap without modifying it"""
     if not DATA_FILE_PATH:
         log_structured(
             storage_logger,
@@ -1248,39 +1570,36 @@ def save_data():
 
     data = {}
     session_count = 0
-    # Save heap items in order from oldest to newest by popping from heap
-    saved_items = []
-    while storage_container.heap:
-        heap_item = storage_container.pop()
-        if heap_item:
-            priority, session_id, storage, _, client_ip = heap_item
-            saved_items.append((priority, session_id, storage, client_ip))
-            session_count += 1
-            session_data = {
-                "users": {
-                    "objects": dict(storage.users.objects),
-                    "last_accessed_ids": storage.users.last_accessed_ids,
-                    "current_id_counter": storage.users.current_id_counter,
-                },
-                "articles": {
-                    "objects": dict(storage.articles.objects),
-                    "last_accessed_ids": storage.articles.last_accessed_ids,
-                    "current_id_counter": storage.articles.current_id_counter,
-                },
-                "comments": {
-                    "objects": dict(storage.comments.objects),
-                    "last_accessed_ids": storage.comments.last_accessed_ids,
-                    "current_id_counter": storage.comments.current_id_counter,
-                },
-                "follows": storage.follows.links,
-                "favorites": storage.favorites.links,
-            }
-            data[session_id] = session_data
-    for priority, session_id, storage, client_ip in saved_items:
-        storage_container.push(priority, session_id, storage, client_ip=client_ip)
+    # Save heap items in order from oldest to newest, the order popping would give, without draining the heap
+    # Objects are serialized in place, nothing else runs on the event loop while this builds and dumps data
+    for _, session_id, storage, _, _ in sorted(storage_container.heap, key=lambda heap_item: heap_item[:2]):
+        session_count += 1
+        session_data = {
+            "users": {
+                "objects": storage.users.objects,
+                "last_accessed_ids": storage.users.last_accessed_ids,
+                "current_id_counter": storage.users.current_id_counter,
+            },
+            "articles": {
+                "objects": storage.articles.objects,
+                "last_accessed_ids": storage.articles.last_accessed_ids,
+                "current_id_counter": storage.articles.current_id_counter,
+            },
+            "comments": {
+                "objects": storage.comments.objects,
+                "last_accessed_ids": storage.comments.last_accessed_ids,
+                "current_id_counter": storage.comments.current_id_counter,
+            },
+            "follows": storage.follows.links,
+            "favorites": storage.favorites.links,
+        }
+        data[session_id] = session_data
     try:
-        with DATA_FILE_PATH.open("w") as f:
-            json.dump(data, f, indent=2)
+        serialized = dumps_data_file(data)
+        with DATA_FILE_PATH.open("wb") as f:  # a single write of the whole file, then flushed to disk before exiting
+            f.write(serialized)
+            f.flush()
+            fsync(f.fileno())
         log_structured(
             storage_logger,
             logging.INFO,
@@ -1302,6 +1621,17 @@ def save_data():
     return False
 
 
+def intern_loaded_strings(objects: dict) -> dict:
+    """Intern short str values, so values repeated across sessions (timestamps, images, tags...) share one copy"""
+    for obj in objects.values():
+        for field, value in obj.items():  # only replacing values, the dict size doesn't change
+            if type(value) is str and len(value) <= 256:  # long texts are mostly unique, not worth hashing
+                obj[field] = sys.intern(value)
+            elif type(value) is list:
+                obj[field] = [sys.intern(v) if type(v) is str and len(v) <= 256 else v for v in value]
+    return objects
+
+
 def load_data():
     """Load storage_container data from JSON file"""
     if not DATA_FILE_PATH:
@@ -1318,24 +1648,26 @@ def load_data():
     )
 
     try:
-        with DATA_FILE_PATH.open("r") as f:
-            data = json.load(f)
+        data = loads_data_file(DATA_FILE_PATH.read_bytes())
         session_count = 0
         for session_id, session_data in data.items():
             storage = InMemoryStorage()
             session_count += 1
             if "users" in session_data:
-                storage.users.objects.update(session_data["users"].get("objects", {}))
+                storage.users.objects.update(intern_loaded_strings(session_data["users"].get("objects", {})))
                 storage.users.last_accessed_ids = session_data["users"].get("last_accessed_ids", [])
                 storage.users.current_id_counter = session_data["users"].get("current_id_counter", 1)
+                storage.users.rebuild_indexes()
             if "articles" in session_data:
-                storage.articles.objects.update(session_data["articles"].get("objects", {}))
+                storage.articles.objects.update(intern_loaded_strings(session_data["articles"].get("objects", {})))
                 storage.articles.last_accessed_ids = session_data["articles"].get("last_accessed_ids", [])
                 storage.articles.current_id_counter = session_data["articles"].get("current_id_counter", 1)
+                storage.articles.rebuild_indexes()
             if "comments" in session_data:
-                storage.comments.objects.update(session_data["comments"].get("objects", {}))
+                storage.comments.objects.update(intern_loaded_strings(session_data["comments"].get("objects", {})))
                 storage.comments.last_accessed_ids = session_data["comments"].get("last_accessed_ids", [])
                 storage.comments.current_id_counter = session_data["comments"].get("current_id_counter", 1)
+                storage.comments.rebuild_indexes()
             storage.follows.links = session_data.get("follows", [])
             storage.favorites.links = session_data.get("favorites", [])
             storage_container._push(time_ns(), session_id, storage)
@@ -1368,10 +1700,14 @@ def load_data():
         )
 
 
+SLUG_UNSAFE_CHARS_RE = re.compile(r"[^\w\s-]")
+SLUG_SEPARATORS_RE = re.compile(r"[-\s]+")
+
+
 def generate_slug(title: str) -> str:
     """Generate URL-friendly slug from title"""
-    slug = re.sub(r"[^\w\s-]", "", title.lower())
-    slug = re.sub(r"[-\s]+", "-", slug)
+    slug = SLUG_UNSAFE_CHARS_RE.sub("", title.lower())
+    slug = SLUG_SEPARATORS_RE.sub("-", slug)
     return slug.strip("-")
 
 
@@ -1396,7 +1732,7 @@ def verify_token(token: str, storage: InMemoryStorage, client_ip: str = None) ->
         return None
 
     # in a real implementation, you'd decode the JWT => for simplicity, we'll store token->user_id mapping
-    user_id = next((user_id for user_id, user in storage.users.items() if user.get("token") == token), None)
+    user_id = next(iter(storage.users.get_ids_by("token", token)), None)
 
     if user_id is None:
         log_structured(
@@ -1413,17 +1749,20 @@ def verify_token(token: str, storage: InMemoryStorage, client_ip: str = None) ->
 
 def get_user_by_email(email: str, storage: InMemoryStorage) -> Optional[Dict]:
     """Find user by email"""
-    return next((user for user in storage.users.values() if user["email"] == email), None)
+    user_id = next(iter(storage.users.get_ids_by("email", email)), None)
+    return storage.users.objects[user_id] if user_id is not None else None
 
 
 def get_user_by_username(username: str, storage: InMemoryStorage) -> Optional[Dict]:
     """Find user by username"""
-    return next((user for user in storage.users.values() if user["username"] == username), None)
+    user_id = next(iter(storage.users.get_ids_by("username", username)), None)
+    return storage.users.objects[user_id] if user_id is not None else None
 
 
 def get_article_by_slug(slug: str, storage: InMemoryStorage) -> Optional[Dict]:
     """Find article by slug"""
-    return next((article for article in storage.articles.values() if article["slug"] == slug), None)
+    article_id = next(iter(storage.articles.get_ids_by("slug", slug)), None)
+    return storage.articles.objects[article_id] if article_id is not None else None
 
 
 def create_user_response(user: Dict, include_token: bool = True) -> Dict:
@@ -1443,7 +1782,7 @@ def create_profile_response(user: Dict, storage: InMemoryStorage, current_user_i
     """Create profile response format"""
     following = False
     if current_user_id:
-        following = storage.follows.is_linked(current_user_id, user["id"])
+        following = storage.follows._is_linked_norm(current_user_id, user["id"])
 
     return {
         "username": user["username"],
@@ -1453,16 +1792,33 @@ def create_profile_response(user: Dict, storage: InMemoryStorage, current_user_i
     }
 
 
+def cached_profile_response(
+    user: Dict, storage: InMemoryStorage, current_user_id: Optional[str], profile_cache: Optional[Dict[str, Dict]]
+) -> Dict:
+    """Profile response through a cache keyed by user id, only valid for one response and one current user"""
+    if profile_cache is None:
+        return create_profile_response(user, storage, current_user_id)
+    profile = profile_cache.get(user["id"])
+    if profile is None:
+        profile = profile_cache[user["id"]] = create_profile_response(user, storage, current_user_id)
+    return profile
+
+
 def create_article_response(
-    article: Dict, storage: InMemoryStorage, current_user_id: Optional[str] = None, *, include_body: bool = True
+    article: Dict,
+    storage: InMemoryStorage,
+    current_user_id: Optional[str] = None,
+    *,
+    include_body: bool = True,
+    profile_cache: Optional[Dict[str, Dict]] = None,
 ) -> Dict:
-    """Create article response format"""
+    """Create article response format, profile_cache lets a list response build each author's profile only once"""
     author = storage.users.get(article["author_id"])
     favorited = False
     if current_user_id:
-        favorited = storage.favorites.is_linked(current_user_id, article["id"])
+        favorited = storage.favorites._is_linked_norm(current_user_id, article["id"])
 
-    favorites_count = len(storage.favorites.sources_for_target(article["id"]))
+    favorites_count = storage.favorites._count_sources_for_target_norm(article["id"])
 
     result = {
         "slug": article["slug"],
@@ -1473,15 +1829,21 @@ def create_article_response(
         "updatedAt": article["updatedAt"],
         "favorited": favorited,
         "favoritesCount": favorites_count,
-        "author": create_profile_response(author, storage, current_user_id),
+        "author": cached_profile_response(author, storage, current_user_id, profile_cache),
     }
     if include_body:
         result["body"] = article["body"]
     return result
 
 
-def create_comment_response(comment: Dict, storage: InMemoryStorage, current_user_id: Optional[str] = None) -> Dict:
-    """Create comment response format"""
+def create_comment_response(
+    comment: Dict,
+    storage: InMemoryStorage,
+    current_user_id: Optional[str] = None,
+    *,
+    profile_cache: Optional[Dict[str, Dict]] = None,
+) -> Dict:
+    """Create comment response format, profile_cache lets a list response build each author's profile only once"""
     author = storage.users.get(comment["author_id"])
 
     return {
@@ -1489,7 +1851,7 @@ def create_comment_response(comment: Dict, storage: InMemoryStorage, current_use
         "createdAt": comment["createdAt"],
         "updatedAt": comment["updatedAt"],
         "body": comment["body"],
-        "author": create_profile_response(author, storage, current_user_id),
+        "author": cached_profile_response(author, storage, current_user_id, profile_cache),
     }
 
 
@@ -1558,7 +1920,7 @@ async def register(body: NewUserRequest, ctx: Annotated[AuthContext, Depends(get
     user = ctx.storage.users.add(user)
     token = generate_token(user["id"])
     storage_container.bind_jwt_to_session_id(token, ctx.session_id)
-    user["token"] = token
+    ctx.storage.users.set_field(user, "token", token)
     log_structured(
         auth_logger,
         logging.INFO,
@@ -1610,7 +1972,7 @@ async def login(body: LoginUserRequest, ctx: Annotated[AuthContext, Depends(get_
                 auth_logger, logging.WARNING, "Login failed: invalid credentials", ip=ctx.client_ip, email=email
             )
             raise HTTPException(status_code=401, detail={"errors": {"credentials": ["invalid"]}})
-    user["token"] = generate_token(user["id"])
+    target_storage.users.set_field(user, "token", generate_token(user["id"]))
     storage_container.bind_jwt_to_session_id(user["token"], target_session_id)
     log_structured(
         auth_logger,
@@ -1639,23 +2001,22 @@ async def update_user(body: UpdateUserRequest, ctx: Annotated[AuthContext, Depen
     user = ctx.storage.users.get(ctx.current_user_id)
     user_data = body.user.model_dump(exclude_unset=True)
 
-    # Helper to update fields
-    def update_field(name, max_len, nullable=False):
-        if name in user_data:
-            value = user_data[name]
-            if nullable and (value is None or value == ""):
-                user[name] = None
-                return
-            if type(value) is not str or len(value) > max_len or not value:
-                raise HTTPException(
-                    status_code=422, detail={"errors": {"body": [f"{name} is a string of less than {max_len} chars"]}}
-                )
-            user[name] = value
-
-    update_field("email", MAX_LEN_USER_EMAIL)
-    update_field("username", MAX_LEN_USER_USERNAME)
-    update_field("bio", MAX_LEN_USER_BIO, nullable=True)
-    update_field("image", MAX_LEN_USER_IMAGE, nullable=True)
+    for name, max_len, nullable in [
+        ("email", MAX_LEN_USER_EMAIL, False),
+        ("username", MAX_LEN_USER_USERNAME, False),
+        ("bio", MAX_LEN_USER_BIO, True),
+        ("image", MAX_LEN_USER_IMAGE, True),
+    ]:
+        if name not in user_data:
+            continue
+        value = user_data[name]
+        if nullable and (value is None or value == ""):
+            value = None
+        elif type(value) is not str or len(value) > max_len or not value:
+            raise HTTPException(
+                status_code=422, detail={"errors": {"body": [f"{name} is a string of less than {max_len} chars"]}}
+            )
+        ctx.storage.users.set_field(user, name, value)  # keeps the email and username indexes up to date
     if "password" in user_data:
         pw = user_data["password"]
         if type(pw) is not str or len(pw) < MIN_LEN_USER_PASSWORD or len(pw) > MAX_LEN_USER_PASSWORD:
@@ -1690,7 +2051,7 @@ async def follow_user(username: str, ctx: Annotated[AuthContext, Depends(get_aut
     user = get_user_by_username(username, ctx.storage)
     if not user:
         raise HTTPException(status_code=404, detail={"errors": {"profile": ["not found"]}})
-    ctx.storage.follows.add(ctx.current_user_id, user["id"])
+    ctx.storage.follows._add_norm(ctx.current_user_id, user["id"])
     return {"profile": create_profile_response(user, ctx.storage, ctx.current_user_id)}
 
 
@@ -1701,7 +2062,7 @@ async def unfollow_user(username: str, ctx: Annotated[AuthContext, Depends(get_a
     user = get_user_by_username(username, ctx.storage)
     if not user:
         raise HTTPException(status_code=404, detail={"errors": {"profile": ["not found"]}})
-    ctx.storage.follows.remove(ctx.current_user_id, user["id"])
+    ctx.storage.follows._remove_norm(ctx.current_user_id, user["id"])
     return {"profile": create_profile_response(user, ctx.storage, ctx.current_user_id)}
 
 
@@ -1716,28 +2077,33 @@ async def list_articles(
     offset: int = 0,
 ):
     """GET /articles - List articles"""
-    articles = list(ctx.storage.articles.values())
+    articles = ctx.storage.articles.snapshot()  # already newest first
     if tag:
-        articles = [a for a in articles if tag in a.get("tagList", [])]
+        tag_article_ids = ctx.storage.articles.get_ids_by("tagList", tag)
+        articles = [a for a in articles if a["id"] in tag_article_ids]
     if author:
         author_user = get_user_by_username(author, ctx.storage)
         if author_user:
-            articles = [a for a in articles if a["author_id"] == author_user["id"]]
+            author_article_ids = ctx.storage.articles.get_ids_by("author_id", author_user["id"])
+            articles = [a for a in articles if a["id"] in author_article_ids]
         else:
             articles = []
     if favorited:
         fav_user = get_user_by_username(favorited, ctx.storage)
         if fav_user:
-            fav_article_ids = ctx.storage.favorites.targets_for_source(fav_user["id"])
+            fav_article_ids = set(ctx.storage.favorites._targets_for_source_norm(fav_user["id"]))
             articles = [a for a in articles if a["id"] in fav_article_ids]
         else:
             articles = []
-    articles.sort(key=lambda x: x["createdAt"], reverse=True)
     total = len(articles)
     articles = articles[offset : offset + limit]
+    profile_cache = {}  # authors usually have several articles in the page
     return {
         "articles": [
-            create_article_response(a, ctx.storage, ctx.current_user_id, include_body=False) for a in articles
+            create_article_response(
+                a, ctx.storage, ctx.current_user_id, include_body=False, profile_cache=profile_cache
+            )
+            for a in articles
         ],
         "articlesCount": total,
     }
@@ -1747,14 +2113,19 @@ async def list_articles(
 async def get_feed(ctx: Annotated[AuthContext, Depends(get_auth_context)], limit: int = 20, offset: int = 0):
     """GET /articles/feed - Get feed"""
     require_auth(ctx)
-    followed_ids = ctx.storage.follows.targets_for_source(ctx.current_user_id)
-    articles = [a for a in ctx.storage.articles.values() if a["author_id"] in followed_ids]
-    articles.sort(key=lambda x: x["createdAt"], reverse=True)
+    followed_ids = ctx.storage.follows._targets_for_source_norm(ctx.current_user_id)
+    get_ids_by = ctx.storage.articles.get_ids_by
+    followed_article_ids = {i for user_id in followed_ids for i in get_ids_by("author_id", user_id)}
+    articles = [a for a in ctx.storage.articles.snapshot() if a["id"] in followed_article_ids]  # newest first
     total = len(articles)
     articles = articles[offset : offset + limit]
+    profile_cache = {}  # authors usually have several articles in the page
     return {
         "articles": [
-            create_article_response(a, ctx.storage, ctx.current_user_id, include_body=False) for a in articles
+            create_article_response(
+                a, ctx.storage, ctx.current_user_id, include_body=False, profile_cache=profile_cache
+            )
+            for a in articles
         ],
         "articlesCount": total,
     }
@@ -1866,11 +2237,11 @@ async def update_article(slug: str, body: UpdateArticleRequest, ctx: Annotated[A
                 detail={"errors": {"body": [f"title is a string of less than {MAX_LEN_ARTICLE_TITLE} chars"]}},
             )
         article["title"] = title
-        new_slug = re.sub(r"[^\w\s-]", "", title.lower()).replace(" ", "-")[:50]
+        new_slug = SLUG_UNSAFE_CHARS_RE.sub("", title.lower()).replace(" ", "-")[:50]
         existing = get_article_by_slug(new_slug, ctx.storage)
         if existing and existing["id"] != article["id"]:
             raise HTTPException(status_code=409, detail={"errors": {"title": ["has already been taken"]}})
-        article["slug"] = new_slug
+        ctx.storage.articles.set_field(article, "slug", new_slug)
     for name, max_len in [("description", MAX_LEN_ARTICLE_DESCRIPTION), ("body", MAX_LEN_ARTICLE_BODY)]:
         if name in article_data:
             value = article_data[name]
@@ -1897,7 +2268,7 @@ async def update_article(slug: str, body: UpdateArticleRequest, ctx: Annotated[A
                     }
                 },
             )
-        article["tagList"] = sorted(tag_list)
+        ctx.storage.articles.set_field(article, "tagList", sorted(tag_list))
     article["updatedAt"] = get_current_time()
     return {"article": create_article_response(article, ctx.storage, ctx.current_user_id)}
 
@@ -1914,7 +2285,7 @@ async def delete_article(slug: str, ctx: Annotated[AuthContext, Depends(get_auth
     article_id = article["id"]
     ctx.storage.articles.delete(article_id)
     ctx.storage.favorites.delete_target(article_id)
-    comments_to_delete = [c_id for c_id, c in ctx.storage.comments.items() if c["article_id"] == article_id]
+    comments_to_delete = list(ctx.storage.comments.get_ids_by("article_id", article_id))  # copy, deleting unindexes
     for c_id in comments_to_delete:
         ctx.storage.comments.delete(c_id)
     log_structured(
@@ -1939,7 +2310,7 @@ async def favorite_article(slug: str, ctx: Annotated[AuthContext, Depends(get_au
     article = get_article_by_slug(slug, ctx.storage)
     if not article:
         raise HTTPException(status_code=404, detail={"errors": {"article": ["not found"]}})
-    ctx.storage.favorites.add(ctx.current_user_id, article["id"])
+    ctx.storage.favorites._add_norm(ctx.current_user_id, article["id"])
     return {"article": create_article_response(article, ctx.storage, ctx.current_user_id)}
 
 
@@ -1950,7 +2321,7 @@ async def unfavorite_article(slug: str, ctx: Annotated[AuthContext, Depends(get_
     article = get_article_by_slug(slug, ctx.storage)
     if not article:
         raise HTTPException(status_code=404, detail={"errors": {"article": ["not found"]}})
-    ctx.storage.favorites.remove(ctx.current_user_id, article["id"])
+    ctx.storage.favorites._remove_norm(ctx.current_user_id, article["id"])
     return {"article": create_article_response(article, ctx.storage, ctx.current_user_id)}
 
 
@@ -1961,9 +2332,14 @@ async def get_comments(slug: str, ctx: Annotated[AuthContext, Depends(get_auth_c
     article = get_article_by_slug(slug, ctx.storage)
     if not article:
         raise HTTPException(status_code=404, detail={"errors": {"article": ["not found"]}})
-    comments = [c for c in ctx.storage.comments.values() if c["article_id"] == article["id"]]
-    comments.sort(key=lambda x: x["createdAt"], reverse=True)
-    return {"comments": [create_comment_response(c, ctx.storage, ctx.current_user_id) for c in comments]}
+    comment_ids = ctx.storage.comments.get_ids_by("article_id", article["id"])
+    comments = [c for c in ctx.storage.comments.snapshot() if c["id"] in comment_ids]  # newest first
+    profile_cache = {}  # commenters usually have several comments on the article
+    return {
+        "comments": [
+            create_comment_response(c, ctx.storage, ctx.current_user_id, profile_cache=profile_cache) for c in comments
+        ]
+    }
 
 
 @app.post(
@@ -2044,7 +2420,8 @@ async def delete_comment(
 @app.get(f"{PATH_PREFIX}/tags", response_model=TagsResponse, responses=RESPONSES_422)
 async def get_tags(ctx: Annotated[AuthContext, Depends(get_auth_context)]):
     """GET /tags - Get all tags"""
-    return {"tags": sorted({t for a in ctx.storage.articles.values() for t in a.get("tagList", [])})}
+    # the tagList index holds each tag in use once, None only stands for articles without a tagList
+    return {"tags": sorted(t for t in ctx.storage.articles.indexed_values("tagList") if t is not None)}
 
 
 # Redirect root and PATH_PREFIX to ReDoc documentation
@@ -2073,6 +2450,7 @@ def run_server(port: int = 8000):
         "Security config",
         isolation_disabled=DISABLE_ISOLATION_MODE,
         max_sessions=MAX_SESSIONS,
+        session_eviction_candidates=SESSION_EVICTION_CANDIDATES,
     )
     # Log data persistence configuration
     log_structured(
@@ -2107,6 +2485,14 @@ def run_server(port: int = 8000):
         log_file=bool(LOG_FILE),
         log_file_path=LOG_FILE,
     )
+    # Log uvicorn configuration
+    log_structured(
+        config_logger,
+        logging.INFO,
+        "Uvicorn config",
+        backlog=UVICORN_BACKLOG,
+        limit_concurrency=UVICORN_LIMIT_CONCURRENCY,
+    )
 
     # Document routes
     print(f"RealWorld API Server running on http://localhost:{port}")
@@ -2114,7 +2500,16 @@ def run_server(port: int = 8000):
     print("\nPress Ctrl+C to stop the server")
 
     # Run with uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=port, log_level="warning")
+    # access_log=False drops the per-request access logger call, log_level="warning" already hid its output
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=port,
+        log_level="warning",
+        access_log=False,
+        backlog=UVICORN_BACKLOG,
+        limit_concurrency=UVICORN_LIMIT_CONCURRENCY,
+    )
 
 
 def calculate_memory():
@@ -2227,6 +2622,18 @@ class TestInMemoryModel(TestCase):
         )
         self.assertEqual(self.model.last_accessed_ids, ["2", "3", "4"])
 
+    @patch("realworld_dummy_server.log_structured")
+    def test_bulk_add_matches_add(self, log_structured_mock):
+        self.model.add({"name": "test0"})
+        self.model.get("1")
+        objs = [{"name": f"test{i}"} for i in range(1, 4)]
+        result = self.model.bulk_add(objs)
+        self.assertIs(result, objs)
+        self.assertEqual([obj["id"] for obj in objs], ["2", "3", "4"])
+        self.assertEqual(self.model.current_id_counter, 5)
+        self.assertEqual(list(self.model.objects), ["2", "3", "4"])
+        self.assertEqual(self.model.last_accessed_ids, ["2", "3", "4"])
+
     def test_add_dict_with_existing_id_key(self):
         # Test adding object that already has an "id" key
         obj = {"name": "test", "id": "existing_id"}
@@ -2254,6 +2661,18 @@ class TestInMemoryModel(TestCase):
         result = self.model.get("999")
         self.assertIsNone(result)
 
+    def test_get_repeated_keeps_access_order(self):
+        obj1, obj2 = self.model.add({"name": "test1"}), self.model.add({"name": "test2"})
+        self.assertIs(self.model.get("1"), obj1)
+        self.assertIs(self.model.get(1), obj1)
+        self.assertEqual(self.model.last_accessed_ids, ["2", "1"])
+        self.model.add({"name": "test3"})
+        self.assertIs(self.model.get("1"), obj1)
+        self.assertEqual(self.model.last_accessed_ids, ["2", "3", "1"])
+        self.model.delete("1")
+        self.assertIsNone(self.model.get("1"))
+        self.assertIs(self.model.get("2"), obj2)
+
     def test_get_with_int_id(self):
         obj = {"name": "test"}
         self.model.add(obj)
@@ -2271,6 +2690,53 @@ class TestInMemoryModel(TestCase):
             self.model.get(long_id)
         self.assertIn("id is too long", str(context.exception))
 
+    # snapshot
+
+    def test_snapshot_newest_first_and_invalidated(self):
+        obj1 = self.model.add({"createdAt": "2024-01-02T00:00:00.000Z"})
+        obj2 = self.model.add({"createdAt": "2024-01-01T00:00:00.000Z"})
+        obj3 = self.model.add({"createdAt": "2024-01-02T00:00:00.000Z"})
+        self.assertEqual(self.model.snapshot(), (obj1, obj3, obj2))  # stable for equal createdAt
+        self.assertIs(self.model.snapshot(), self.model.snapshot())
+        self.model.delete("1")
+        self.assertEqual(self.model.snapshot(), (obj3, obj2))
+        obj4 = self.model.add({"createdAt": "2024-01-03T00:00:00.000Z"})
+        self.assertEqual(self.model.snapshot(), (obj4, obj3, obj2))
+
+    # indexes
+
+    @patch("realworld_dummy_server.log_structured")
+    def test_indexed_fields(self, log_structured_mock):
+        model = InMemoryModel(max_count=2, indexed_fields=("author_id",))
+        model.add({"author_id": "a"})
+        model.add({"author_id": "b"})
+        self.assertEqual(list(model.get_ids_by("author_id", "a")), ["1"])
+        model.set_field(model.objects["2"], "author_id", "a")
+        self.assertEqual(list(model.get_ids_by("author_id", "a")), ["1", "2"])
+        self.assertEqual(list(model.get_ids_by("author_id", "b")), [])
+        model.add({"author_id": "a"})  # evicts "1"
+        self.assertEqual(list(model.get_ids_by("author_id", "a")), ["2", "3"])
+        model.delete("2")
+        self.assertEqual(list(model.get_ids_by("author_id", "a")), ["3"])
+        model.objects["3"]["author_id"] = "c"
+        model.rebuild_indexes()
+        self.assertEqual(list(model.get_ids_by("author_id", "a")), [])
+        self.assertEqual(list(model.get_ids_by("author_id", "c")), ["3"])
+
+    @patch("realworld_dummy_server.log_structured")
+    def test_indexed_list_field(self, log_structured_mock):
+        model = InMemoryModel(max_count=2, indexed_fields=("tagList",))
+        model.add({"tagList": ["a", "b", "a"]})
+        model.add({"tagList": ["b"]})
+        self.assertEqual(list(model.get_ids_by("tagList", "a")), ["1"])
+        self.assertEqual(list(model.get_ids_by("tagList", "b")), ["1", "2"])
+        self.assertEqual(sorted(model.indexed_values("tagList")), ["a", "b"])
+        model.set_field(model.objects["1"], "tagList", ["c"])
+        self.assertEqual(sorted(model.indexed_values("tagList")), ["b", "c"])
+        self.assertEqual(list(model.get_ids_by("tagList", "b")), ["2"])
+        model.delete("2")
+        self.assertEqual(list(model.indexed_values("tagList")), ["c"])
+
     # keys / values / items
 
     def test_keys(self):
@@ -2708,6 +3174,26 @@ class TestInMemoryLinks(TestCase):
         sources = self.links.sources_for_target(3)
         self.assertEqual(sorted(sources), ["1", "2"])
 
+    def test_len(self):
+        self.assertEqual(len(self.links), 0)
+        self.links.add("1", "2")
+        self.links.add("1", "3")
+        self.links.add("1", "2")  # already linked
+        self.assertEqual(len(self.links), 2)
+        self.links.remove("1", "2")
+        self.assertEqual(len(self.links), 1)
+
+    def test_count_sources_for_target(self):
+        self.assertEqual(self.links.count_sources_for_target("2"), 0)
+        self.links.add("1", "2")
+        self.links.add(3, 2)
+        self.links.add("1", "4")
+        self.assertEqual(self.links.count_sources_for_target(2), 2)
+        self.links.remove("1", "2")
+        self.assertEqual(self.links.count_sources_for_target("2"), 1)
+        self.links.delete_source("3")
+        self.assertEqual(self.links.count_sources_for_target("2"), 0)
+
     def test_delete_source_empty_links(self):
         self.links.delete_source("1")
         self.assertEqual(self.links.links, [])
@@ -2768,6 +3254,16 @@ class TestInMemoryLinks(TestCase):
         self.links.delete_target(2)
         self.assertEqual(self.links.links, [("3", "4")])
 
+    def test_links_setter_rebuilds_indexes(self):
+        self.links.add("9", "9")
+        self.links.links = [["1", "2"], ["1", "3"], ["2", "3"]]  # as loaded from JSON
+        self.assertEqual(self.links.links, [("1", "2"), ("1", "3"), ("2", "3")])
+        self.assertFalse(self.links.is_linked("9", "9"))
+        self.assertEqual(self.links.targets_for_source("1"), ["2", "3"])
+        self.assertEqual(self.links.sources_for_target("3"), ["1", "2"])
+        self.links.delete_source("1")
+        self.assertEqual(self.links.sources_for_target("3"), ["2"])
+
 
 class TestStorageContainer(TestCase):
     # Setup
@@ -2777,6 +3273,10 @@ class TestStorageContainer(TestCase):
 
     # Helpers
 
+    def _ip_sessions(self, container):
+        # ip_to_sessions as lists, so assertions also check the order of the sessions for each ip
+        return {ip: list(sessions) for ip, sessions in container.ip_to_sessions.items()}
+
     def _verify_heap_property(self, container):
         # Helper to verify min-heap property for a given container
         for i in range(len(container.heap)):
@@ -3272,58 +3772,58 @@ class TestStorageContainer(TestCase):
     def test_handle_client_ip_and_session_eviction_with_empty_ip(self):
         """Test eviction with empty/None client_ip"""
         self.container._push(1, "session1", "data1", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = ["session1"]
+        self.container.ip_to_sessions["192.168.1.1"] = {"session1": None}
         self.container._handle_client_ip_and_session_eviction("session1", None)
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": ["session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": ["session1"]})
         self.container._handle_client_ip_and_session_eviction("session1", "")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": ["session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": ["session1"]})
 
     def test_handle_client_ip_and_session_eviction_removes_session_from_ip(self):
         """Test eviction removes session from ip_to_sessions"""
         self.container._push(1, "session1", "data1", "192.168.1.1")
         self.container._push(2, "session2", "data2", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = ["session1", "session2"]
+        self.container.ip_to_sessions["192.168.1.1"] = {"session1": None, "session2": None}
         self.container._handle_client_ip_and_session_eviction("session1", "192.168.1.1")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": ["session2"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": ["session2"]})
 
     def test_handle_client_ip_and_session_eviction_removes_empty_ip_entry(self):
         """Test eviction removes IP entry when it becomes empty"""
         self.container._push(1, "session1", "data1", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = ["session1"]
+        self.container.ip_to_sessions["192.168.1.1"] = {"session1": None}
         self.container._handle_client_ip_and_session_eviction("session1", "192.168.1.1")
-        self.assertEqual(self.container.ip_to_sessions, {})
+        self.assertEqual(self._ip_sessions(self.container), {})
 
     def test_handle_client_ip_and_session_eviction_nonexistent_ip(self):
         """Test eviction with non-existent IP"""
         self.container._handle_client_ip_and_session_eviction("session1", "192.168.1.1")
-        self.assertEqual(self.container.ip_to_sessions, {})
+        self.assertEqual(self._ip_sessions(self.container), {})
 
     def test_handle_client_ip_and_session_eviction_ipv6_normalization(self):
         """Test eviction with IPv6 address normalization"""
         ipv6_addr = "2001:db8:85a3:8d3:1319:8a2e:370:7348"
         normalized_ip = "2001:db8:85a3:8d3::/64"
         self.container._push(1, "session1", "data1", ipv6_addr)
-        self.container.ip_to_sessions[normalized_ip] = ["session1"]
+        self.container.ip_to_sessions[normalized_ip] = {"session1": None}
         self.container._handle_client_ip_and_session_eviction("session1", ipv6_addr)
-        self.assertEqual(self.container.ip_to_sessions, {})
+        self.assertEqual(self._ip_sessions(self.container), {})
 
     def test_handle_client_ip_and_session_addition_with_empty_ip(self):
         """Test addition with empty/None client_ip"""
         self.container._handle_client_ip_and_session_addition("session1", None)
-        self.assertEqual(self.container.ip_to_sessions, {})
+        self.assertEqual(self._ip_sessions(self.container), {})
         self.container._handle_client_ip_and_session_addition("session1", "")
-        self.assertEqual(self.container.ip_to_sessions, {})
+        self.assertEqual(self._ip_sessions(self.container), {})
 
     def test_handle_client_ip_and_session_addition_new_ip(self):
         """Test addition creates new IP entry"""
         self.container._handle_client_ip_and_session_addition("session1", "192.168.1.1")
-        self.assertEqual(self.container.ip_to_sessions["192.168.1.1"], ["session1"])
+        self.assertEqual(self._ip_sessions(self.container)["192.168.1.1"], ["session1"])
 
     def test_handle_client_ip_and_session_addition_existing_ip(self):
         """Test addition to existing IP entry"""
-        self.container.ip_to_sessions["192.168.1.1"] = ["session1"]
+        self.container.ip_to_sessions["192.168.1.1"] = {"session1": None}
         self.container._handle_client_ip_and_session_addition("session2", "192.168.1.1")
-        self.assertEqual(self.container.ip_to_sessions["192.168.1.1"], ["session1", "session2"])
+        self.assertEqual(self._ip_sessions(self.container)["192.168.1.1"], ["session1", "session2"])
 
     def test_handle_client_ip_and_session_addition_exceeds_max_sessions_by_one(self):
         """Test addition that exceeds MAX_SESSIONS_PER_IP by one"""
@@ -3331,7 +3831,7 @@ class TestStorageContainer(TestCase):
         sessions = [f"session{i}" for i in range(MAX_SESSIONS_PER_IP + 1)]
         for i, session in enumerate(sessions[:-1]):
             self.container._push(i, session, f"data{i}", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = sessions[:-1]
+        self.container.ip_to_sessions["192.168.1.1"] = dict.fromkeys(sessions[:-1])
         # Add the final session that exceeds the limit
         final_session = sessions[-1]
         self.container._push(len(sessions), final_session, f"data{len(sessions)}", "192.168.1.1")
@@ -3339,7 +3839,7 @@ class TestStorageContainer(TestCase):
         self.container._handle_client_ip_and_session_addition(final_session, "192.168.1.1")
         # Verify the session was added and the first session was deleted
         self.assertIn(final_session, self.container.ip_to_sessions["192.168.1.1"])
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": [f"session{i}" for i in range(1, 11)]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": [f"session{i}" for i in range(1, 11)]})
 
     def test_handle_client_ip_and_session_addition_exceeds_max_sessions_by_multiple(self):
         """Test addition that exceeds MAX_SESSIONS_PER_IP by multiple"""
@@ -3347,7 +3847,7 @@ class TestStorageContainer(TestCase):
         sessions = [f"session{i}" for i in range(MAX_SESSIONS_PER_IP + 5)]
         for i, session in enumerate(sessions[:-1]):
             self.container._push(i, session, f"data{i}", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = sessions[:-1]
+        self.container.ip_to_sessions["192.168.1.1"] = dict.fromkeys(sessions[:-1])
         # Add the final session that exceeds the limit
         final_session = sessions[-1]
         self.container._push(len(sessions), final_session, f"data{len(sessions)}", "192.168.1.1")
@@ -3355,107 +3855,107 @@ class TestStorageContainer(TestCase):
         self.container._handle_client_ip_and_session_addition(final_session, "192.168.1.1")
         # Verify the session was added and the first session was deleted
         self.assertIn(final_session, self.container.ip_to_sessions["192.168.1.1"])
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": [f"session{i}" for i in range(5, 15)]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": [f"session{i}" for i in range(5, 15)]})
 
     def test_handle_client_ip_and_session_addition_ipv6_normalization(self):
         """Test addition with IPv6 address normalization"""
         ipv6_addr = "2001:db8:85a3:8d3:1319:8a2e:370:7348"
         normalized_ip = "2001:db8:85a3:8d3::/64"
         self.container._handle_client_ip_and_session_addition("session1", ipv6_addr)
-        self.assertEqual(self.container.ip_to_sessions, {normalized_ip: ["session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {normalized_ip: ["session1"]})
 
     def test_handle_client_ip_and_session_priority_with_empty_ip(self):
         """Test priority handling with empty/None client_ip"""
         self.container._push(1, "session1", "data1", "192.168.1.1")
         self.container._handle_client_ip_and_session_priority("session1", None)
         self.container._handle_client_ip_and_session_priority("session1", "")
-        self.assertEqual(self.container.ip_to_sessions, {})
+        self.assertEqual(self._ip_sessions(self.container), {})
 
     def test_handle_client_ip_and_session_priority_same_ip_one_session(self):
         """Test priority handling when session IP hasn't changed"""
         self.container._push(1, "session1", "data1", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = ["session1"]
+        self.container.ip_to_sessions["192.168.1.1"] = {"session1": None}
         self.container._handle_client_ip_and_session_priority("session1", "192.168.1.1")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": ["session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": ["session1"]})
 
     def test_handle_client_ip_and_session_priority_same_ip_no_reorder(self):
         """Test priority handling when session IP hasn't changed"""
         self.container._push(1, "session1", "data1", "192.168.1.1")
         self.container._push(2, "session2", "data2", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = ["session1", "session2"]
+        self.container.ip_to_sessions["192.168.1.1"] = {"session1": None, "session2": None}
         self.container._handle_client_ip_and_session_priority("session2", "192.168.1.1")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": ["session1", "session2"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": ["session1", "session2"]})
 
     def test_handle_client_ip_and_session_priority_same_ip_with_reorder(self):
         """Test priority handling when session IP hasn't changed"""
         self.container._push(1, "session1", "data1", "192.168.1.1")
         self.container._push(2, "session2", "data2", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = ["session1", "session2"]
+        self.container.ip_to_sessions["192.168.1.1"] = {"session1": None, "session2": None}
         self.container._handle_client_ip_and_session_priority("session1", "192.168.1.1")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": ["session2", "session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": ["session2", "session1"]})
 
     def test_handle_client_ip_and_session_priority_ip_not_in_sessions_and_no_sessions(self):
         """Test priority handling when IP not in sessions (edge case) - no sessions at all"""
         self.container._push(1, "session1", "data1", "192.168.1.1")
         self.container._handle_client_ip_and_session_priority("session1", "192.168.1.1")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": ["session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": ["session1"]})
 
     def test_handle_client_ip_and_session_priority_ip_not_in_sessions_and_existing_session(self):
         """Test priority handling when IP not in sessions (edge case) - existing session for that ip"""
         self.container._push(1, "session1", "data1", "192.168.1.1")
         self.container._push(2, "session2", "data2", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = ["session2"]
+        self.container.ip_to_sessions["192.168.1.1"] = {"session2": None}
         self.container._handle_client_ip_and_session_priority("session1", "192.168.1.1")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": ["session2", "session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": ["session2", "session1"]})
 
     def test_handle_client_ip_and_session_priority_different_ip_only_one_session(self):
         """Test priority handling when session IP has changed - only one session exists"""
         self.container._push(1, "session1", "data1", "192.168.1.1")
         self.container._handle_client_ip_and_session_priority("session1", "192.168.1.2")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.2": ["session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.2": ["session1"]})
 
     def test_handle_client_ip_and_session_priority_different_ip_one_other_session_for_previous_ip(self):
         """Test priority handling when session IP has changed - one other session for previous ip"""
         self.container._push(0, "session0", "data0", "192.168.1.1")
         self.container._push(1, "session1", "data1", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = ["session0", "session1"]
+        self.container.ip_to_sessions["192.168.1.1"] = {"session0": None, "session1": None}
         self.container._handle_client_ip_and_session_priority("session1", "192.168.1.2")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": ["session0"], "192.168.1.2": ["session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": ["session0"], "192.168.1.2": ["session1"]})
 
     def test_handle_client_ip_and_session_priority_different_ip_one_other_session_for_next_ip(self):
         """Test priority handling when session IP has changed - one other session for next ip"""
         self.container._push(0, "session0", "data0", "192.168.1.2")
         self.container._push(1, "session1", "data1", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.2"] = ["session0"]
-        self.container.ip_to_sessions["192.168.1.1"] = ["session1"]
+        self.container.ip_to_sessions["192.168.1.2"] = {"session0": None}
+        self.container.ip_to_sessions["192.168.1.1"] = {"session1": None}
         self.container._handle_client_ip_and_session_priority("session1", "192.168.1.2")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.2": ["session0", "session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.2": ["session0", "session1"]})
 
     def test_handle_client_ip_and_session_priority_different_ip_max_other_session_for_next_ip(self):
         """Test priority handling when session IP has changed - enough sessions for next ip to trigger cleaning"""
         self.container._push(0, "session0", "data0", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = ["session0"]
-        self.container.ip_to_sessions["192.168.1.2"] = []
+        self.container.ip_to_sessions["192.168.1.1"] = {"session0": None}
+        self.container.ip_to_sessions["192.168.1.2"] = {}
         for i in range(1, MAX_SESSIONS_PER_IP + 1):
             self.container._push(i, f"session{i}", f"data{i}", "192.168.1.2")
-            self.container.ip_to_sessions["192.168.1.2"].append(f"session{i}")
+            self.container.ip_to_sessions["192.168.1.2"][f"session{i}"] = None
         self.container._handle_client_ip_and_session_priority("session0", "192.168.1.2")
         self.assertEqual(
-            self.container.ip_to_sessions,
+            self._ip_sessions(self.container),
             {"192.168.1.2": [*(f"session{i}" for i in range(2, MAX_SESSIONS_PER_IP + 1)), "session0"]},
         )
 
     def test_handle_client_ip_and_session_priority_different_ip_more_than_max_other_session_for_next_ip(self):
         """Test priority handling when session IP has changed - enough sessions for next ip to trigger cleaning x5"""
         self.container._push(0, "session0", "data0", "192.168.1.1")
-        self.container.ip_to_sessions["192.168.1.1"] = ["session0"]
-        self.container.ip_to_sessions["192.168.1.2"] = []
+        self.container.ip_to_sessions["192.168.1.1"] = {"session0": None}
+        self.container.ip_to_sessions["192.168.1.2"] = {}
         for i in range(1, MAX_SESSIONS_PER_IP + 5):
             self.container._push(i, f"session{i}", f"data{i}", "192.168.1.2")
-            self.container.ip_to_sessions["192.168.1.2"].append(f"session{i}")
+            self.container.ip_to_sessions["192.168.1.2"][f"session{i}"] = None
         self.container._handle_client_ip_and_session_priority("session0", "192.168.1.2")
         self.assertEqual(
-            self.container.ip_to_sessions,
+            self._ip_sessions(self.container),
             {"192.168.1.2": [*(f"session{i}" for i in range(6, MAX_SESSIONS_PER_IP + 5)), "session0"]},
         )
 
@@ -3465,13 +3965,13 @@ class TestStorageContainer(TestCase):
         self.container._handle_client_ip_and_session_reattribution("session1", "192.168.1.1", "192.168.1.2")
         session_data = self.container.heap[self.container.index_map["session1"]]
         self.assertEqual(session_data[4], "192.168.1.2")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.2": ["session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.2": ["session1"]})
 
     def test_handle_client_ip_and_session_reattribution_with_none_old_ip(self):
         """Test reattribution with None old IP"""
         self.container._push(1, "session1", "data1", "192.168.1.1")
         self.container._handle_client_ip_and_session_reattribution("session1", None, "192.168.1.2")
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.2": ["session1"]})
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.2": ["session1"]})
 
     def test_ipv6_session_accessed_from_other_ip_then_evicted_does_not_brick_ip_range(self):
         """Regression test: the heap item saved the raw client_ip while ip_to_sessions keys are normalized,
@@ -3480,13 +3980,13 @@ class TestStorageContainer(TestCase):
         The per-IP eviction loop then raised ValueError forever for new sessions from that /64"""
         self.container.push(1, "session1", "data1", client_ip="2001:db8:85a3:8d3:1319:8a2e:370:7348")
         self.container.update_priority("session1", 2, client_ip="192.168.1.1")  # client switches networks
-        self.assertEqual(self.container.ip_to_sessions, {"192.168.1.1": ["session1"]})  # no stale /64 entry
+        self.assertEqual(self._ip_sessions(self.container), {"192.168.1.1": ["session1"]})  # no stale /64 entry
         self.container.pop()  # session eventually evicted
-        self.assertEqual(self.container.ip_to_sessions, {})
+        self.assertEqual(self._ip_sessions(self.container), {})
         for i in range(MAX_SESSIONS_PER_IP + 1):  # new clients from the original /64 - raised ValueError
             self.container.push(10 + i, f"other{i}", f"data{i}", client_ip=f"2001:db8:85a3:8d3:aaaa::{i:x}")
         self.assertEqual(
-            self.container.ip_to_sessions,
+            self._ip_sessions(self.container),
             {"2001:db8:85a3:8d3::/64": [f"other{i}" for i in range(1, MAX_SESSIONS_PER_IP + 1)]},
         )
         self._verify_index_consistency(self.container)
@@ -3508,6 +4008,13 @@ class TestStorageContainer(TestCase):
         result = self.container._normalize_ip_for_limiting(ipv6_addr)
         self.assertEqual(result, "2001:db8:85a3/64")
 
+    def test_normalize_ip_for_limiting_ipv6_compressed(self):
+        """Test IP normalization for compressed and IPv4-mapped IPv6 addresses"""
+        self.assertEqual(self.container._normalize_ip_for_limiting("2001:db8::1"), "2001:db8::/64")
+        self.assertEqual(self.container._normalize_ip_for_limiting("2001:db8::2:1"), "2001:db8::/64")
+        self.assertEqual(self.container._normalize_ip_for_limiting("::1"), "::/64")
+        self.assertEqual(self.container._normalize_ip_for_limiting("::ffff:192.168.1.1"), "192.168.1.1")
+
     def test_normalize_ip_for_limiting_already_normalized(self):
         """Test IP normalization for already normalized IPv6"""
         ipv6_normalized = "2001:db8:85a3:8d3::/64"
@@ -3589,23 +4096,21 @@ class TestStorageContainer(TestCase):
         # First create a session
         session_id, storage = container.get_storage("test_session")
         # Bind JWT to session
-        container.jwt_to_session["test_jwt"] = session_id
-        container.jwt_to_session_order.append("test_jwt")
+        container.bind_jwt_to_session_id("test_jwt", session_id)
         # Now get storage using JWT token
         returned_session_id, returned_storage = container.get_storage(None, jwt_token="test_jwt")
         # Should return the same session and storage
         self.assertEqual(returned_session_id, session_id)
         self.assertIs(returned_storage, storage)
-        # JWT should be moved to end of order list
-        self.assertEqual(container.jwt_to_session_order[-1], "test_jwt")
+        # JWT should be moved to the most recently used end
+        self.assertEqual(list(container.jwt_to_session)[-1], "test_jwt")
 
     @patch("realworld_dummy_server.log_structured")
     def test_get_storage_with_jwt_token_nonexistent_session(self, log_structured_mock):
         """Test get_storage with JWT token that maps to nonexistent session"""
         container = _StorageContainer(disable_isolation_mode=False)
         # Bind JWT to nonexistent session
-        container.jwt_to_session["test_jwt"] = "nonexistent_session"
-        container.jwt_to_session_order.append("test_jwt")
+        container.bind_jwt_to_session_id("test_jwt", "nonexistent_session")
         # Get storage using JWT token
         session_id, storage = container.get_storage(None, jwt_token="test_jwt")
         # Should create new session since mapped session doesn't exist
@@ -3630,8 +4135,7 @@ class TestStorageContainer(TestCase):
         cookie_session_id, cookie_storage = container.get_storage("cookie_session")
         # Create different session and bind JWT to it
         jwt_session_id, jwt_storage = container.get_storage("jwt_session")
-        container.jwt_to_session["test_jwt"] = jwt_session_id
-        container.jwt_to_session_order.append("test_jwt")
+        container.bind_jwt_to_session_id("test_jwt", jwt_session_id)
         # Get storage with both cookie and JWT
         returned_session_id, returned_storage = container.get_storage("cookie_session", jwt_token="test_jwt")
         # Should return cookie session, not JWT session
@@ -3654,6 +4158,51 @@ class TestStorageContainer(TestCase):
         # id_2 and id_3 stored
         self.assertEqual({id_2, id_3}, set(container.index_map))
 
+    @patch("realworld_dummy_server.log_structured")
+    def test_get_storage_max_sessions_eviction_smallest_candidate(self, log_structured_mock):
+        """Test that the smallest of the oldest sessions is evicted when eviction_candidates > 1"""
+        container = _StorageContainer(disable_isolation_mode=False, max_sessions=3, eviction_candidates=2)
+        _, storage_1 = container.get_storage("session1", client_ip="1.2.3.4")
+        container.get_storage("session2", client_ip="1.2.3.4")
+        container.get_storage("session3", client_ip="1.2.3.4")
+        storage_1.users.add({"username": "user"})
+        # session1 is the oldest but holds more than session2, session3 is not a candidate
+        container.get_storage("session4", client_ip="1.2.3.4")
+        self.assertEqual({"session1", "session3", "session4"}, set(container.index_map))
+        self.assertEqual(["session1", "session3", "session4"], self._ip_sessions(container)["1.2.3.4"])
+        # Same sizes, the oldest candidate goes
+        container.get_storage("session5", client_ip="1.2.3.4")
+        self.assertEqual({"session1", "session4", "session5"}, set(container.index_map))
+
+    @patch("realworld_dummy_server.log_structured")
+    def test_get_storage_max_sessions_eviction_candidates_deep_heap(self, log_structured_mock):
+        """Test that the candidates are the oldest sessions when the heap has more levels than eviction_candidates"""
+        container = _StorageContainer(disable_isolation_mode=False, max_sessions=20, eviction_candidates=3)
+        for priority in (17, 3, 12, 8, 1, 19, 6, 14, 10, 2, 16, 5, 11, 20, 4, 9, 18, 7, 15, 13):
+            container.push(priority, f"session{priority}", data=InMemoryStorage(with_demo_data=False))
+        # The 3 oldest are session1, session2 and session3, the 2 oldest hold more
+        container.heap[container.index_map["session1"]][2].users.add({"username": "user1"})
+        container.heap[container.index_map["session2"]][2].users.add({"username": "user2"})
+        container.heap[container.index_map["session4"]][2].users.add({"username": "user4"})
+        self.assertEqual(
+            ["session1", "session2", "session3"],
+            [item[1] for item in heapq.nsmallest(3, container.heap, key=lambda item: item[:2])],
+        )
+        container.get_storage("new_session")
+        self.assertNotIn("session3", container.index_map)
+        self.assertEqual(20, len(container.index_map))
+        # session1, session2 and session4 are now the candidates, same sizes, the oldest goes
+        container.get_storage("another_session")
+        self.assertNotIn("session1", container.index_map)
+        self.assertIn("session2", container.index_map)
+        self.assertIn("session5", container.index_map)
+
+    def test_eviction_candidates_bounds(self):
+        """Test that eviction_candidates must be between 1 and 10"""
+        for eviction_candidates in (0, 11):
+            with self.assertRaises(ValueError):
+                _StorageContainer(disable_isolation_mode=False, eviction_candidates=eviction_candidates)
+
     # Tests - bind_jwt_to_session_id
 
     def test_bind_jwt_to_session_id_with_isolation_disabled(self):
@@ -3663,7 +4212,7 @@ class TestStorageContainer(TestCase):
         container.bind_jwt_to_session_id("test_jwt", "test_session")
         # JWT mappings should remain empty
         self.assertEqual(len(container.jwt_to_session), 0)
-        self.assertEqual(len(container.jwt_to_session_order), 0)
+        self.assertEqual(len(container.session_to_jwt), 0)
 
     def test_bind_jwt_to_session_id_new_binding(self):
         """Test binding new JWT token to session"""
@@ -3672,49 +4221,45 @@ class TestStorageContainer(TestCase):
         container.bind_jwt_to_session_id("test_jwt", "test_session")
         # JWT should be bound to session
         self.assertEqual(container.jwt_to_session["test_jwt"], "test_session")
-        self.assertIn("test_jwt", container.jwt_to_session_order)
+        self.assertEqual(container.session_to_jwt, {"test_session": "test_jwt"})
 
     def test_bind_jwt_to_session_id_replace_existing_jwt(self):
         """Test replacing existing JWT token mapping"""
         container = _StorageContainer(disable_isolation_mode=False)
         # Create initial binding
-        container.jwt_to_session["test_jwt"] = "old_session"
-        container.jwt_to_session_order.append("test_jwt")
+        container.bind_jwt_to_session_id("test_jwt", "old_session")
         # Replace binding
         container.bind_jwt_to_session_id("test_jwt", "new_session")
         # JWT should be bound to new session
         self.assertEqual(container.jwt_to_session["test_jwt"], "new_session")
-        self.assertIn("test_jwt", container.jwt_to_session_order)
+        self.assertEqual(container.session_to_jwt, {"new_session": "test_jwt"})
 
     def test_bind_jwt_to_session_id_replace_session_mapping(self):
         """Test replacing session that already has JWT mapping"""
         container = _StorageContainer(disable_isolation_mode=False)
         # Create initial binding
-        container.jwt_to_session["old_jwt"] = "test_session"
-        container.jwt_to_session_order.append("old_jwt")
+        container.bind_jwt_to_session_id("old_jwt", "test_session")
         # Bind new JWT to same session
         container.bind_jwt_to_session_id("new_jwt", "test_session")
         # Old JWT should be removed, new JWT should be bound
         self.assertNotIn("old_jwt", container.jwt_to_session)
         self.assertEqual(container.jwt_to_session["new_jwt"], "test_session")
-        self.assertNotIn("old_jwt", container.jwt_to_session_order)
-        self.assertIn("new_jwt", container.jwt_to_session_order)
+        self.assertEqual(container.session_to_jwt, {"test_session": "new_jwt"})
 
     def test_bind_jwt_to_session_id_max_sessions_eviction(self):
         """Test that max sessions limit triggers JWT eviction"""
         container = _StorageContainer(disable_isolation_mode=False, max_sessions=4)
         # Fill up to max sessions
         for i in range(4):
-            container.jwt_to_session[f"jwt_{i}"] = f"session_{i}"
-            container.jwt_to_session_order.append(f"jwt_{i}")
+            container.bind_jwt_to_session_id(f"jwt_{i}", f"session_{i}")
         # Bind new JWT should evict oldest
         container.bind_jwt_to_session_id("new_jwt", "new_session")
         # Oldest JWT should be removed
         self.assertNotIn("jwt_0", container.jwt_to_session)
-        self.assertNotIn("jwt_0", container.jwt_to_session_order)
+        self.assertNotIn("session_0", container.session_to_jwt)
         # New JWT should be bound
         self.assertEqual(container.jwt_to_session["new_jwt"], "new_session")
-        self.assertIn("new_jwt", container.jwt_to_session_order)
+        self.assertEqual(container.session_to_jwt["new_session"], "new_jwt")
 
     def test_find_session_by_credentials_not_found(self):
         """Test finding session with credentials that don't exist"""
@@ -4272,7 +4817,12 @@ class TestSaveAndLoadData(TestCase):
         # This should reorder the storages in output
         _, storage1 = storage_container.get_storage("session_1")
         # Call save_data to save all the populated data
+        heap_before = [list(heap_item) for heap_item in storage_container.heap]
+        ip_to_sessions_before = {ip: list(sessions) for ip, sessions in storage_container.ip_to_sessions.items()}
         save_data()
+        # Saving only reads the container
+        self.assertEqual(storage_container.heap, heap_before)
+        self.assertEqual({ip: list(s) for ip, s in storage_container.ip_to_sessions.items()}, ip_to_sessions_before)
         with self.TEST_DATA_FILE_PATH.open() as f:
             saved_data = json.loads(f.read())
         # Next line actually compares order